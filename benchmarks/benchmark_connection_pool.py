@@ -0,0 +1,56 @@
+"""
+Benchmark for the pooled HTTP session of AlgoBullsAPI.
+
+Starts a local FakeAlgoBullsServer and polls the job status on it with connection keep-alive turned on and off,
+printing the requests/sec along with the p50/p99 latency of both the runs.
+
+Usage:
+    python benchmarks/benchmark_connection_pool.py [--requests 2000] [--threads 8] [--latency 0]
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pyalgotrading.algobulls.api import AlgoBullsAPI
+from pyalgotrading.algobulls.fake_server import FakeAlgoBullsServer
+from pyalgotrading.constants import TradingType
+
+
+def run(api, total_requests, threads):
+    def _request(_):
+        start = time.perf_counter()
+        api.get_job_status(strategy_code='benchmark', trading_type=TradingType.BACKTESTING)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(_request, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'rps': total_requests / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0, help='latency (in seconds) added by the server to every response')
+    args = parser.parse_args()
+
+    with FakeAlgoBullsServer(latency=args.latency) as server:
+        for label, keep_alive in [('without pooling', False), ('with pooling', True)]:
+            api = AlgoBullsAPI(connection=None, pool_size=args.threads, keep_alive=keep_alive, base_url=server.base_url)
+            api.set_access_token('benchmark')
+            api.coalescer = None  # every request is sent, none is shared with another thread
+            result = run(api, args.requests, args.threads)
+            api.close()
+            print(f"{label:>16}: {result['rps']:8.1f} req/s | p50 {result['p50_ms']:6.2f} ms | p99 {result['p99_ms']:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark for the adaptive polling of logs (AdaptivePoller) against the previous fixed sleeps of AlgoBullsConnection.get_logs.
+
+Starts a local FakeAlgoBullsServer and follows the logs of a job with both the schedules, in two scenarios:
+    * catch-up: a backtest emitting logs faster than one page per second
+    * live: a paper trade emitting a burst of log lines at every (scaled down) candle of --candle seconds
+
+For every run, prints the number of requests made (log pages + job status), and the mean/max latency between a log line becoming available on the server and the client receiving it.
+
+Usage:
+    python benchmarks/benchmark_log_polling.py [--lines 20000] [--rate 2000] [--live-lines 120] [--live-rate 2] [--candle 10]
+"""
+import argparse
+import time
+
+from pyalgotrading.algobulls import AlgoBullsConnection
+from pyalgotrading.algobulls.fake_server import FakeAlgoBullsServer
+from pyalgotrading.algobulls.polling import AdaptivePoller
+from pyalgotrading.constants import ExecutionStatus, TradingType
+
+
+def follow_legacy(connection, strategy_code, trading_type, candle_seconds):
+    # The schedule of get_logs before AdaptivePoller: 5s while STARTING or on empty pages, the candle interval after a full page, else 1s
+    api, token, status = connection.api, None, None
+    while True:
+        if status is None or status == ExecutionStatus.STARTING.value:
+            status = api.get_job_status(strategy_code, trading_type)['message']
+            time.sleep(5)
+            continue
+        response = api.get_logs(strategy_code=strategy_code, trading_type=trading_type, initial_next_token=token)
+        logs, token = response['data'], response.get('nextForwardToken', token)
+        if not logs:
+            status = api.get_job_status(strategy_code, trading_type)['message']
+            if status in [ExecutionStatus.STOPPED.value, ExecutionStatus.STOPPING.value]:
+                return
+            time.sleep(5)
+            continue
+        yield logs
+        time.sleep(candle_seconds if len(logs) >= api.page_size else 1)
+
+
+def follow_adaptive(connection, strategy_code, trading_type, candle_seconds):
+    poller = AdaptivePoller(max_interval=candle_seconds, candle_interval=candle_seconds) if trading_type is not TradingType.BACKTESTING else AdaptivePoller()
+    yield from connection.iter_logs(strategy_code, trading_type, poller=poller)
+
+
+def get_available_at(job, index):
+    # monotonic time at which the log line with this index became available on the server
+    available_at = job.submitted_at + job.starting_delay + (index + 1) / job.log_lines_per_second
+    if job.log_burst_interval:
+        wall_clock = time.time() - (time.monotonic() - available_at)
+        available_at += -wall_clock % job.log_burst_interval
+    return available_at
+
+
+def run(server, follow, trading_type, candle_seconds):
+    connection = AlgoBullsConnection(base_url=server.base_url)
+    connection.set_access_token('benchmark', validate_token=False)
+    strategy_code = server.add_strategy(f'benchmark-{time.monotonic()}')
+    timestamps = ('2021-08-02 09:15 +0530', '2021-08-02 15:30 +0530') if trading_type is TradingType.BACKTESTING else ('09:15 +0530', '15:30 +0530')
+    connection.start_job(strategy_code=strategy_code, start_timestamp=timestamps[0], end_timestamp=timestamps[1], instruments='NSE:SBIN', lots=1, strategy_parameters={}, candle_interval='1 minute',
+                         trading_type=trading_type, delete_previous_trades=False)
+    job = max(server.jobs.values(), key=lambda _: _.submitted_at)
+    requests_before = sum(server.request_counts.values())
+
+    received, latencies = 0, []
+    for logs in follow(connection, strategy_code, trading_type, candle_seconds):
+        now = time.monotonic()
+        received += len(logs)
+        latencies += [now - get_available_at(job, _) for _ in range(received - len(logs), received)]
+
+    return {
+        'lines': received,
+        'requests': sum(server.request_counts.values()) - requests_before,
+        'latency_mean': sum(latencies) / len(latencies),
+        'latency_max': max(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=20000, help='log lines of the catch-up (backtest) job')
+    parser.add_argument('--rate', type=float, default=2000, help='log lines per second of the catch-up job')
+    parser.add_argument('--live-lines', type=int, default=120, help='log lines of the live (paper trade) job')
+    parser.add_argument('--live-rate', type=float, default=2, help='log lines per second of the live job')
+    parser.add_argument('--candle', type=float, default=10, help='candle interval (in seconds) of the live job')
+    args = parser.parse_args()
+
+    scenarios = [
+        ('catch-up', TradingType.BACKTESTING, args.lines, args.rate, None, 1),
+        ('live', TradingType.PAPERTRADING, args.live_lines, args.live_rate, args.candle, args.candle),
+    ]
+    for scenario, trading_type, lines, rate, burst_interval, candle_seconds in scenarios:
+        with FakeAlgoBullsServer(log_lines=lines, log_lines_per_second=rate, log_burst_interval=burst_interval) as server:
+            for label, follow in [('fixed', follow_legacy), ('adaptive', follow_adaptive)]:
+                result = run(server, follow, trading_type, candle_seconds)
+                print(f"{scenario:>8} {label:>8}: {result['lines']:6d} lines | {result['requests']:4d} requests | latency mean {result['latency_mean']:6.2f} s, max {result['latency_max']:6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark for the columnar rendering of the order history (OrderHistoryTable) against the previous per-order tabulate calls and explode/json_normalize of
+AlgoBullsConnection.get_report_order_history.
+
+Generates order records whose states mix strings, numbers, numeric strings (with thousands separators too), empty strings, missing keys and None values, checks that both the renderers
+give the same text and the same DataFrame, and prints the time taken by both. Tables of random cells are also checked to be formatted the same as by tabulate.
+
+Usage:
+    python benchmarks/benchmark_order_history.py [--orders 5000]
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+from tabulate import tabulate
+
+from pyalgotrading.algobulls.order_history import OrderHistoryTable, _format_psql
+
+CELLS = ['', None, '  ', 'OPEN', 'Insufficient margin', '12abc', '-', '1,000', '-1,234.5', '1,0000', '512.50', '+5', '.5', '1_000', '0x1F', '1e999', 'nan', 'inf', 'True', 'False',
+         True, 12, 0, 512.5, float('nan'), 'ü', '中', 'a\nb']
+
+
+def get_records(count):
+    _random = random.Random(0)
+    records = []
+    for index in range(count):
+        states = []
+        for _ in range(_random.randint(0, 4)):
+            state = {'timestamp_created': f'2021-08-02T09:{index % 60:02d}:{len(states):02d}+05:30', 'state': _random.choice(['OPEN', 'OPEN PENDING', 'COMPLETE', 'REJECTED'])}
+            kind = index % 6
+            if kind == 1:
+                state['filled_quantity'] = _random.randint(0, 10)  # numbers, right aligned by tabulate
+            elif kind == 2:
+                state['remarks'] = None  # missing values only
+            elif kind == 3:
+                state['remarks'] = _random.choice([None, 'Insufficient margin', ''])
+            elif kind == 4 and _random.random() < 0.5:
+                state['average_price'] = _random.choice(['512.50', 512.5, None])  # numeric strings, numbers and missing values, in some states only
+            elif kind == 5:
+                # empty strings (missing values for tabulate), numbers with thousands separators, 'nan' and booleans, alone or mixed with text
+                state['filled_quantity'] = _random.choice(['1,000', '-1,234.5', '', 'nan', 12])
+                state['remarks'] = _random.choice(['', 12, 'True', 'Insufficient margin'])
+            states.append(state)
+        records.append({'orderId': f'{index:032x}', 'transaction_type': 'BUY' if index % 2 == 0 else 'SELL', 'instrument': 'NSE_EQ:SBIN', 'quantity': 1 + index % 3, 'currency': '₹',
+                        'price': round(500 + 10 * _random.random(), 2), 'customer_tradebook_states': states})
+    return records
+
+
+def check_format_psql(count):
+    # tables of 1 to 3 columns of random cells, with and without headers
+    _random = random.Random(0)
+    for _ in range(count):
+        rows = _random.randint(1, 4)
+        columns = [[_random.choice(CELLS) for _ in range(rows)] for _ in range(_random.randint(1, 3))]
+        headers = [f'h{index}' * _random.randint(1, 3) for index in range(len(columns))] if _random.random() < 0.7 else None
+        assert _format_psql(columns, headers=headers) == tabulate(list(zip(*columns)), headers=headers or (), tablefmt='psql'), f'The table {columns} differs from that of tabulate'
+
+
+def render_legacy(main_data):
+    main_order_string = ""
+    for i in range(len(main_data)):
+        order_detail = [
+            ["Order ID", main_data[i]["orderId"]],
+            ["Transaction Type", main_data[i]["transaction_type"]],
+            ["Instrument", main_data[i]["instrument"]],
+            ["Quantity", main_data[i]["quantity"]],
+            ["Price", str(main_data[i]["currency"]) + str(main_data[i]["price"])]
+        ]
+        main_order_string += tabulate(order_detail, tablefmt="psql") + "\n"
+        main_order_string += tabulate(main_data[i]["customer_tradebook_states"], headers="keys", tablefmt="psql") + "\n"
+        main_order_string += '\n' + '======' * 15 + '\n'
+    return main_order_string
+
+
+def to_dataframe_legacy(main_data):
+    df = pd.DataFrame(main_data).explode('customer_tradebook_states').reset_index(drop=True)
+    df = df.join(pd.json_normalize(df.pop('customer_tradebook_states')))
+    return df.set_index("orderId").sort_values("timestamp_created", kind='stable')[["timestamp_created", "transaction_type", "state", "instrument", "quantity", "currency", "price"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=5000)
+    args = parser.parse_args()
+
+    check_format_psql(10000)
+    print('tables   : identical')
+
+    records = get_records(args.orders)
+
+    start = time.perf_counter()
+    text_legacy = render_legacy(records)
+    time_legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    text = OrderHistoryTable(records).render()
+    time_columnar = time.perf_counter() - start
+    assert text == text_legacy, 'The rendered text differs from that of tabulate'
+    print(f'text     : legacy {time_legacy:7.3f} s | columnar {time_columnar:7.3f} s | identical')
+
+    start = time.perf_counter()
+    df_legacy = to_dataframe_legacy(records)
+    time_legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    df = OrderHistoryTable(records).to_dataframe()
+    time_columnar = time.perf_counter() - start
+    assert df.index.equals(df_legacy.index) and all(df[_].astype(object).where(df[_].notna(), None).tolist() == df_legacy[_].astype(object).where(df_legacy[_].notna(), None).tolist()
+                                                   for _ in df.columns), 'The DataFrame differs from that of explode & json_normalize'
+    print(f'dataframe: legacy {time_legacy:7.3f} s | columnar {time_columnar:7.3f} s | identical')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,3 +3,11 @@ Package for interacting with the [AlgoBulls](https://www.algobulls.com) backend
 """
 
 from .connection import AlgoBullsConnection
+from .api_async import AsyncAlgoBullsAPI
+from .coalesce import RequestCoalescer
+from .log_parser import LogTable
+from .log_index import LogIndex
+from .log_spool import LogSpool, LogSpoolReader
+from .order_history import OrderHistoryTable
+from .monitor import JobMonitor
+from .job_queue import JobQueue, JobResultStore
@@ -1,41 +1,183 @@
 """
 Module for handling API calls to the [AlgoBulls](https://www.algobulls.com) backend.
 """
+import hashlib
 import json
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt, timezone
 from json import JSONDecodeError
 
 import requests
+from requests.adapters import HTTPAdapter
 
+try:
+    import orjson  # optional; several times faster than the json module for the multi-MB report payloads
+except ImportError:
+    orjson = None
+
+from .cache import JSONFileCache
+from .metrics import APIMetrics
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
 from .exceptions import AlgoBullsAPIBaseException, AlgoBullsAPIUnauthorizedErrorException, AlgoBullsAPIInsufficientBalanceErrorException, AlgoBullsAPIResourceNotFoundErrorException, AlgoBullsAPIBadRequestException, \
     AlgoBullsAPIInternalServerErrorException, AlgoBullsAPIForbiddenErrorException, AlgoBullsAPIGatewayTimeoutErrorException
 from ..constants import TradingType, TradingReportType
 from ..utils.func import get_raw_response
 
+# Endpoint (path prefix) to endpoint family mapping; used for rate limiting the endpoint families independently
+ENDPOINT_FAMILY_MAP = {
+    'v4/user/strategy/logs': 'logs',
+    'v4/book/pl/data': 'reports',
+    'v5/build/python/user/order/charts': 'reports',
+    'v2/user/strategy/status': 'job_control',
+    'v2/portfolio/strategy': 'job_control',
+    'v4/portfolio/tweak': 'job_control',
+    'v5/portfolio/strategies': 'job_control',
+    'v3/build/python/user/strategy/deleteAll': 'job_control',
+}
+
+# Path segments matching this are part of an endpoint template; all others are ids or keys
+ENDPOINT_STATIC_SEGMENT_PATTERN = re.compile(r'^(v\d+|[A-Za-z]*)$')
+
+
+def json_loads(content: [bytes, str]):
+    """
+    Decode JSON content, using orjson if it is installed, else the json module
+
+    Args:
+        content: JSON document
+
+    Returns:
+        decoded JSON
+
+    Raises:
+        JSONDecodeError if content is not a valid JSON document
+    """
+
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+def get_endpoint_family(endpoint: str) -> str:
+    """
+    Fetch the family of an endpoint
+
+    Args:
+        endpoint: endpoint url, with or without the query string
+
+    Returns:
+        one of the values of ENDPOINT_FAMILY_MAP, or 'default'
+    """
+
+    path = endpoint.split('?', 1)[0]
+    for prefix, family in ENDPOINT_FAMILY_MAP.items():
+        if path == prefix or path.startswith(f'{prefix}/'):
+            return family
+    return 'default'
+
+
+def get_endpoint_template(endpoint: str) -> str:
+    """
+    Fetch the template of an endpoint, i.e. the endpoint without its query string and with ids & keys replaced by '{id}'
+
+    Args:
+        endpoint: endpoint url
+
+    Returns:
+        endpoint template, say 'v4/portfolio/tweak/{id}' for 'v4/portfolio/tweak/<key>?isPythonBuild=true'
+    """
+
+    path = endpoint.split('?', 1)[0]
+    return '/'.join(_ if ENDPOINT_STATIC_SEGMENT_PATTERN.match(_) else '{id}' for _ in path.split('/'))
+
 
 class AlgoBullsAPI:
     """
     AlgoBulls API
     """
     SERVER_ENDPOINT = 'https://api.algobulls.com/'
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_MAX_RETRIES = 0
+    DEFAULT_KEY_CACHE_TTL = 7 * 24 * 60 * 60
 
-    def __init__(self, connection):
+    def __init__(self, connection, pool_size: int = DEFAULT_POOL_SIZE, max_retries: int = DEFAULT_MAX_RETRIES, keep_alive: bool = True, base_url: str = SERVER_ENDPOINT, cache_dir: str = None,
+                 key_cache_ttl: float = DEFAULT_KEY_CACHE_TTL):
         """
         Init method that is used while creating an object of this class
+
+        Args:
+            connection: AlgoBullsConnection object owning this API object
+            base_url: base url of the AlgoBulls backend, say of a FakeAlgoBullsServer for offline testing
+            pool_size: maximum number of persistent connections kept open to the platform
+            max_retries: number of times a failed connection attempt is retried (no request is re-sent once it reaches the server)
+            keep_alive: if True, connections are reused across requests; else every request opens a new connection
+            cache_dir: if given, strategy keys are also cached in this directory, so that they survive process restarts; say `cache.DEFAULT_CACHE_DIR`
+            key_cache_ttl: time-to-live (in seconds) of the strategy keys cached on disk
         """
         self.connection = connection
+        self.base_url = base_url if base_url.endswith('/') else f'{base_url}/'
         self.headers = None
+        self.session = None
+        self.pool_size = pool_size
+        self.configure_connection_pool(pool_size=pool_size, max_retries=max_retries, keep_alive=keep_alive)
+        self.metrics = APIMetrics()  # per endpoint request counts, latencies, retries & bytes; see APIMetrics.snapshot() and APIMetrics.to_prometheus()
+        self.pre_request_hooks = []
+        self.post_request_hooks = []
+        self.retry_policy = RetryPolicy()
+        self.rate_limiter = RateLimiter()  # no limits by default; see RateLimiter.set_limit()
+        self.coalescer = None  # opt-in; set to a RequestCoalescer() for identical concurrent GET requests to share one call, whose (unmodified) response is shared by all the callers
         self.page_size = 1000
         self.__key_backtesting = {}  # strategy-cstc_id mapping
         self.__key_papertrading = {}  # strategy-cstc_id mapping
         self.__key_realtrading = {}  # strategy-cstc_id mapping
+        self.__key_lock = threading.Lock()
+        self.__key_locks = {}
+        self.cache_dir = cache_dir
+        self.key_cache_ttl = key_cache_ttl
+        self.key_cache = None  # on-disk strategy key cache; created by set_access_token() if cache_dir is given
         self.pattern = re.compile(r'(?<!^)(?=[A-Z])')
 
     def __convert(self, _dict):
         # Helps convert _dict keys from camelcase to snakecase
         return {self.pattern.sub('_', k).lower(): v for k, v in _dict.items()}
 
+    def configure_connection_pool(self, pool_size: int = DEFAULT_POOL_SIZE, max_retries: int = DEFAULT_MAX_RETRIES, keep_alive: bool = True):
+        """
+        (Re)create the HTTP session shared by all the endpoint methods of this class
+
+        Args:
+            pool_size: maximum number of persistent connections kept open to the platform
+            max_retries: number of times a failed connection attempt is retried
+            keep_alive: if True, connections are reused across requests; else every request opens a new connection
+        """
+
+        assert isinstance(pool_size, int) and pool_size > 0, f'Argument "pool_size" should be a positive integer'
+        assert isinstance(max_retries, int) and max_retries >= 0, f'Argument "max_retries" should be a non-negative integer'
+
+        if self.session is not None:
+            self.session.close()
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+
+        self.session = session
+        self.pool_size = pool_size
+
+    def close(self):
+        """
+        Close all the pooled connections
+        """
+
+        if self.session is not None:
+            self.session.close()
+
     def set_access_token(self, access_token: str):
         """
         Set access token to the header attribute, which is needed for APIs requiring authorization
@@ -49,30 +191,62 @@ class AlgoBullsAPI:
             'Authorization': f'{access_token}'
         }
 
-    def _send_request(self, method: str = 'get', endpoint: str = '', base_url: str = SERVER_ENDPOINT, params: [str, dict] = None, json_data: [str, dict] = None, requires_authorization: bool = True,
-                      raise_exception_unknown_status_code: bool = True) -> dict:
+        if self.cache_dir is not None:
+            # Keys are per user, hence the cache file is namespaced by a hash of the token (the token itself is never written to disk)
+            namespace = hashlib.sha256(f'{self.base_url}{access_token}'.encode()).hexdigest()[:16]
+            self.key_cache = JSONFileCache(path=os.path.join(self.cache_dir, f'strategy_keys_{namespace}.json'), ttl=self.key_cache_ttl)
+
+    def _send_request(self, method: str = 'get', endpoint: str = '', base_url: str = None, params: [str, dict] = None, json_data: [str, dict] = None, requires_authorization: bool = True,
+                      raise_exception_unknown_status_code: bool = True, raw: bool = False) -> [dict, bytes]:
         """
         Send the request to the platform
         
         Args:
             method: get
             endpoint: endpoint url
-            base_url: base url
+            base_url: base url; defaults to `self.base_url`
             params: parameters
             json_data: json data as body
             requires_authorization: True or False
+            raw: if True, the body of a successful response is returned as bytes without being decoded
 
         Returns:
             request status
         """
 
-        url = f'{base_url}{endpoint}'
+        url = f'{base_url or self.base_url}{endpoint}'
         headers = self.headers if requires_authorization else None
-        r = requests.request(method=method, headers=headers, url=url, params=params, json=json_data)
+
+        if method.lower() == 'get' and self.coalescer is not None:
+            # GET requests are idempotent; identical ones in flight at the same time are sent once. The decoded response is the same object for all the callers, who should not modify it
+            key = (url, repr(sorted(params.items()) if isinstance(params, dict) else params), repr(headers), raise_exception_unknown_status_code, raw)
+            return self.coalescer.do(key, lambda: self.__send_request(method=method, endpoint=endpoint, url=url, headers=headers, params=params, json_data=json_data,
+                                                                       raise_exception_unknown_status_code=raise_exception_unknown_status_code, raw=raw))
+        return self.__send_request(method=method, endpoint=endpoint, url=url, headers=headers, params=params, json_data=json_data, raise_exception_unknown_status_code=raise_exception_unknown_status_code, raw=raw)
+
+    def __send_request(self, method, endpoint, url, headers, params, json_data, raise_exception_unknown_status_code, raw):
+        # Send a single request to the platform; see _send_request()
+        self.rate_limiter.acquire(get_endpoint_family(endpoint))
+        info = {'method': method.upper(), 'endpoint': get_endpoint_template(endpoint)}
+        for hook in self.pre_request_hooks:
+            hook(info)
+
+        start = time.perf_counter()
+        try:
+            r = self.session.request(method=method, headers=headers, url=url, params=params, json=json_data)
+        except requests.RequestException as ex:
+            info.update({'status': type(ex).__name__, 'latency': time.perf_counter() - start, 'bytes_sent': 0, 'bytes_received': 0, 'bytes_decoded': 0})
+            self.__after_request(info)
+            raise
+        info['latency'] = time.perf_counter() - start
+        info['status'] = r.status_code
+        self.__after_request(info, r)
 
         if r.status_code == 200:
+            if raw:
+                return r.content
             try:
-                r_json = r.json()
+                r_json = json_loads(r.content)
                 return r_json
             except JSONDecodeError:
                 r.raw.decode_content = True
@@ -94,16 +268,97 @@ class AlgoBullsAPI:
             raise AlgoBullsAPIResourceNotFoundErrorException(method=method, url=url, response=get_raw_response(r), status_code=404)
         elif r.status_code == 500:
             r.raw.decode_content = True
-            raise AlgoBullsAPIInternalServerErrorException(method=method, url=url, response=get_raw_response(r), status_code=500)
+            raise AlgoBullsAPIInternalServerErrorException(method=method, url=url, response=get_raw_response(r), status_code=500, retry_after=r.headers.get('Retry-After'))
         elif r.status_code == 504:
             r.raw.decode_content = True
-            raise AlgoBullsAPIGatewayTimeoutErrorException(method=method, url=url, response=get_raw_response(r), status_code=504)
+            raise AlgoBullsAPIGatewayTimeoutErrorException(method=method, url=url, response=get_raw_response(r), status_code=504, retry_after=r.headers.get('Retry-After'))
         else:
             if raise_exception_unknown_status_code:
                 r.raw.decode_content = True
-                raise AlgoBullsAPIBaseException(method=method, url=url, response=get_raw_response(r), status_code=r.status_code)
+                raise AlgoBullsAPIBaseException(method=method, url=url, response=get_raw_response(r), status_code=r.status_code, retry_after=r.headers.get('Retry-After'))
             else:
-                return r.json()
+                return json_loads(r.content)
+
+    def __after_request(self, info, r=None):
+        # Record the metrics of a request (the transfer stats are derived from them), then call the post-request hooks
+        if r is not None:
+            # r.raw.tell() is the number of bytes read off the wire, i.e. before the content encoding (gzip, br, ...) was decoded
+            info['bytes_sent'] = len(r.request.body or b'')
+            info['bytes_decoded'] = len(r.content)
+            info['bytes_received'] = r.raw.tell() if r.raw is not None else info['bytes_decoded']
+
+        self.metrics.record(method=info['method'], endpoint=info['endpoint'], status=info['status'], latency=info['latency'], bytes_sent=info['bytes_sent'], bytes_received=info['bytes_received'], bytes_decoded=info['bytes_decoded'])
+        for hook in self.post_request_hooks:
+            hook(info)
+
+    def __record_retry(self, attempt, ex, delay):
+        # Retry hook of self.retry_policy; exceptions raised by _send_request carry the method & url of the failed request
+        if isinstance(ex, AlgoBullsAPIBaseException):
+            self.metrics.record_retry(method=ex.method, endpoint=get_endpoint_template(ex.url[len(self.base_url):] if ex.url.startswith(self.base_url) else ex.url.split('://', 1)[-1].split('/', 1)[-1]))
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """
+        Retry policy used by AlgoBullsConnection for retrying calls which fail with a 5xx status code
+        """
+
+        return self.__retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, retry_policy: RetryPolicy):
+        self.track_retries(retry_policy)
+        self.__retry_policy = retry_policy
+
+    def track_retries(self, retry_policy: RetryPolicy):
+        """
+        Record the retries of a retry policy in `metrics`; done for `retry_policy`, and to be done for every other policy retrying the calls of this object
+
+        Args:
+            retry_policy: RetryPolicy object
+        """
+
+        if self.__record_retry not in retry_policy.hooks:
+            retry_policy.hooks.append(self.__record_retry)
+
+    def add_request_hooks(self, pre=None, post=None):
+        """
+        Add callables to be called before and after every request
+
+        Args:
+            pre: called as `pre(info)` before a request is sent; `info` is a dict with keys 'method' and 'endpoint' (endpoint template, with ids & keys masked)
+            post: called as `post(info)` after a response (or a connection error) is received; `info` additionally has the keys 'status', 'latency' (in seconds), 'bytes_sent', 'bytes_received' and 'bytes_decoded'
+        """
+
+        if pre is not None:
+            self.pre_request_hooks.append(pre)
+        if post is not None:
+            self.post_request_hooks.append(post)
+
+    def get_transfer_stats(self) -> dict:
+        """
+        Fetch the number of bytes moved per endpoint since this object was created (or the stats were reset)
+
+        Returns:
+            dict of endpoint template to a dict with keys 'requests', 'bytes_sent', 'bytes_received' (compressed, as transferred), 'bytes_decoded' (uncompressed) and 'compression_ratio'
+        """
+
+        # derived from the per (method, endpoint) metrics; requests which got no response (say, a connection error) moved no bytes and are not counted
+        transfer_stats = {}
+        for name, metrics in self.metrics.snapshot().items():
+            if not metrics['bytes']:
+                continue
+            stats = transfer_stats.setdefault(name.split(' ', 1)[1], {'requests': 0, 'bytes_sent': 0, 'bytes_received': 0, 'bytes_decoded': 0})
+            stats['requests'] += sum(count for status, count in metrics['requests'].items() if status.isdigit())
+            for direction in ['sent', 'received', 'decoded']:
+                stats[f'bytes_{direction}'] += metrics['bytes'][direction]
+        return {endpoint: dict(stats, compression_ratio=stats['bytes_decoded'] / stats['bytes_received'] if stats['bytes_received'] else None) for endpoint, stats in transfer_stats.items()}
+
+    def reset_transfer_stats(self):
+        """
+        Reset the per endpoint transfer stats, along with the rest of `metrics` they are derived from
+        """
+
+        self.metrics.reset()
 
     def __fetch_key(self, strategy_code, trading_type):
         """
@@ -141,22 +396,90 @@ class AlgoBullsAPI:
 
         return key
 
-    def __get_key(self, strategy_code, trading_type):
+    def __get_key_map(self, trading_type):
         if trading_type is TradingType.BACKTESTING:
-            if self.__key_backtesting.get(strategy_code) is None:
-                self.__key_backtesting[strategy_code] = self.__fetch_key(strategy_code=strategy_code, trading_type=TradingType.BACKTESTING)
-            return self.__key_backtesting[strategy_code]
+            return self.__key_backtesting
         elif trading_type is TradingType.PAPERTRADING:
-            if self.__key_papertrading.get(strategy_code) is None:
-                self.__key_papertrading[strategy_code] = self.__fetch_key(strategy_code=strategy_code, trading_type=TradingType.PAPERTRADING)
-            return self.__key_papertrading[strategy_code]
+            return self.__key_papertrading
         elif trading_type is TradingType.REALTRADING:
-            if self.__key_realtrading.get(strategy_code) is None:
-                self.__key_realtrading[strategy_code] = self.__fetch_key(strategy_code=strategy_code, trading_type=TradingType.REALTRADING)
-            return self.__key_realtrading[strategy_code]
+            return self.__key_realtrading
         else:
             raise NotImplementedError
 
+    def __get_key(self, strategy_code, trading_type):
+        key_map = self.__get_key_map(trading_type)
+
+        if key_map.get(strategy_code) is None:
+            # one lock per (strategy, trading type), so that concurrent callers fetch a key only once without blocking each other on different keys
+            with self.__key_lock:
+                lock = self.__key_locks.setdefault((strategy_code, trading_type), threading.Lock())
+            with lock:
+                if key_map.get(strategy_code) is None:
+                    cache_key = f'{trading_type.name}:{strategy_code}'
+                    key = self.key_cache.get(cache_key) if self.key_cache is not None else None
+                    if key is None:
+                        key = self.__fetch_key(strategy_code=strategy_code, trading_type=trading_type)
+                        if self.key_cache is not None and key is not None:
+                            self.key_cache.set(cache_key, key)
+                    key_map[strategy_code] = key
+        return key_map[strategy_code]
+
+    def __send_keyed_request(self, strategy_code, trading_type, get_request):
+        # Send a request built by `get_request(key)` from the key of a strategy. A key cached on disk may be stale (say, the strategy was re-added on the platform), in which case the
+        # platform answers with a 404; the key is then fetched afresh and the request sent once more. Returns the key along with the response
+        key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
+        try:
+            return key, self._send_request(**get_request(key))
+        except AlgoBullsAPIResourceNotFoundErrorException:
+            if self.key_cache is None:
+                raise
+            self.invalidate_keys(strategy_code=strategy_code, trading_type=trading_type)
+            key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
+            return key, self._send_request(**get_request(key))
+
+    def invalidate_keys(self, strategy_code: str = None, trading_type: TradingType = None):
+        """
+        Forget cached strategy keys, in memory as well as on disk, so that they are fetched again on next use
+
+        Args:
+            strategy_code: strategy code; None means all the strategies
+            trading_type: trading type; None means all the trading types
+        """
+
+        for _trading_type in ([trading_type] if trading_type is not None else list(TradingType)):
+            key_map = self.__get_key_map(_trading_type)
+            for _strategy_code in ([strategy_code] if strategy_code is not None else list(key_map)):
+                key_map.pop(_strategy_code, None)
+                if self.key_cache is not None and strategy_code is not None:
+                    self.key_cache.invalidate(f'{_trading_type.name}:{_strategy_code}')
+
+        if self.key_cache is not None and strategy_code is None:
+            if trading_type is None:
+                self.key_cache.invalidate()
+            else:
+                for cache_key in self.key_cache.keys():
+                    if cache_key.startswith(f'{trading_type.name}:'):
+                        self.key_cache.invalidate(cache_key)
+
+    def prefetch_keys(self, strategy_codes: list, trading_types: list = None, max_workers: int = None) -> dict:
+        """
+        Fetch the keys of many strategies concurrently, so that the first status, logs or report calls of every strategy do not pay for a key round-trip
+
+        Args:
+            strategy_codes: strategy codes
+            trading_types: trading types; defaults to all the trading types
+            max_workers: maximum number of concurrent requests; defaults to `self.pool_size`
+
+        Returns:
+            dict of (strategy code, trading type) to key
+        """
+
+        trading_types = list(TradingType) if trading_types is None else trading_types
+        pairs = [(strategy_code, trading_type) for strategy_code in strategy_codes for trading_type in trading_types]
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as executor:
+            keys = executor.map(lambda pair: self.__get_key(strategy_code=pair[0], trading_type=pair[1]), pairs)
+            return dict(zip(pairs, keys))
+
     def create_strategy(self, strategy_name: str, strategy_details: str, abc_version: str) -> dict:
         """
         Create a new strategy for the user on the AlgoBulls platform.
@@ -302,10 +625,8 @@ class AlgoBullsAPI:
         """
 
         # Configure the params
-        key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
-        endpoint = f'v4/portfolio/tweak/{key}?isPythonBuild=true'
         print('Setting Strategy Config...', end=' ')
-        response = self._send_request(method='post', endpoint=endpoint, json_data=strategy_config)
+        key, response = self.__send_keyed_request(strategy_code, trading_type, lambda key: {'method': 'post', 'endpoint': f'v4/portfolio/tweak/{key}?isPythonBuild=true', 'json_data': strategy_config})
         print('Success.')
 
         return key, response
@@ -329,7 +650,6 @@ class AlgoBullsAPI:
         """
 
         try:
-            key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
             map_trading_type_to_date_key = {
                 TradingType.REALTRADING: 'liveDataTime',
                 TradingType.PAPERTRADING: 'backDataTime',
@@ -351,10 +671,12 @@ class AlgoBullsAPI:
                 endpoint = f'v5/portfolio/strategies?isPythonBuild=true&isLive=true&location={location}'
             else:
                 raise NotImplementedError
-            json_data = {'method': 'update', 'newVal': 1, 'key': key, 'record': {'status': 0, 'lots': lots, 'executeConfig': execute_config}, 'dataIndex': 'executeConfig'}
             print(f'Submitting {trading_type.name} job...', end=' ')
 
-            response = self._send_request(method='patch', endpoint=endpoint, json_data=json_data, params=params)
+            _, response = self.__send_keyed_request(strategy_code, trading_type, lambda key: {
+                'method': 'patch', 'endpoint': endpoint, 'params': params,
+                'json_data': {'method': 'update', 'newVal': 1, 'key': key, 'record': {'status': 0, 'lots': lots, 'executeConfig': execute_config}, 'dataIndex': 'executeConfig'}
+            })
             print('Success.')
 
             return response
@@ -376,10 +698,10 @@ class AlgoBullsAPI:
 
         endpoint = 'v5/portfolio/strategies'
         try:
-            key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
-            json_data = {'method': 'update', 'newVal': 0, 'key': key, 'record': {'status': 2}, 'dataIndex': 'executeConfig'}
             print(f'Stopping {trading_type.name} job...', end=' ')
-            response = self._send_request(method='patch', endpoint=endpoint, json_data=json_data)
+            _, response = self.__send_keyed_request(strategy_code, trading_type, lambda key: {
+                'method': 'patch', 'endpoint': endpoint, 'json_data': {'method': 'update', 'newVal': 0, 'key': key, 'record': {'status': 2}, 'dataIndex': 'executeConfig'}
+            })
             print('Success.')
 
             return response
@@ -402,10 +724,8 @@ class AlgoBullsAPI:
             `GET` v2/user/strategy/status
         """
 
-        key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
-        params = {'key': key}
         endpoint = f'v2/user/strategy/status'
-        response = self._send_request(endpoint=endpoint, params=params)
+        _, response = self.__send_keyed_request(strategy_code, trading_type, lambda key: {'endpoint': endpoint, 'params': {'key': key}})
 
         return response
 
@@ -425,16 +745,17 @@ class AlgoBullsAPI:
             `POST`: v2/user/strategy/logs
         """
 
-        key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
         endpoint = 'v4/user/strategy/logs'
-        json_data = {'key': key, 'nextForwardToken': initial_next_token, 'limit': self.page_size, 'direction': 'forward', 'type': 'userLogs'}
         params = {'isPythonBuild': True, 'isLive': trading_type == TradingType.REALTRADING}
 
-        response = self._send_request(method='post', endpoint=endpoint, json_data=json_data, params=params)
+        _, response = self.__send_keyed_request(strategy_code, trading_type, lambda key: {
+            'method': 'post', 'endpoint': endpoint, 'params': params,
+            'json_data': {'key': key, 'nextForwardToken': initial_next_token, 'limit': self.page_size, 'direction': 'forward', 'type': 'userLogs'}
+        })
 
         return response
 
-    def get_reports(self, strategy_code: str, trading_type: TradingType, report_type: TradingReportType, country: str, current_page: int) -> dict:
+    def get_reports(self, strategy_code: str, trading_type: TradingType, report_type: TradingReportType, country: str, current_page: int, raw: bool = False) -> [dict, bytes]:
         """
         Fetch report for a strategy
 
@@ -444,6 +765,7 @@ class AlgoBullsAPI:
             report_type: Value of TradingReportType Enum
             country: Country of the exchange
             current_page: current page of data being retrieved (for order history)
+            raw: if True, the undecoded JSON response is returned as bytes, for callers decoding it themselves
         Returns:
             Report data
 
@@ -452,7 +774,6 @@ class AlgoBullsAPI:
             `GET` v5/build/python/user/order/charts     Order History
         """
 
-        key = self.__get_key(strategy_code=strategy_code, trading_type=trading_type)
         if report_type is TradingReportType.PNL_TABLE:
             _filter = json.dumps({"tradingType": trading_type.value})
             endpoint = f'v4/book/pl/data'
@@ -463,6 +784,6 @@ class AlgoBullsAPI:
         else:
             raise NotImplementedError
 
-        response = self._send_request(endpoint=endpoint, params=params)
+        _, response = self.__send_keyed_request(strategy_code, trading_type, lambda key: {'endpoint': endpoint, 'params': params, 'raw': raw})
 
         return response
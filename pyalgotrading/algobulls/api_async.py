@@ -0,0 +1,105 @@
+"""
+Module for handling API calls to the [AlgoBulls](https://www.algobulls.com) backend from asyncio code.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime as dt
+
+from .api import AlgoBullsAPI
+from ..constants import TradingType, TradingReportType
+
+
+class AsyncAlgoBullsAPI:
+    """
+    Asyncio face of AlgoBullsAPI
+
+    Every coroutine runs the matching AlgoBullsAPI method on a bounded thread pool, so requests share the same pooled HTTP session, access token, strategy keys and exception mapping as the synchronous API.
+    """
+
+    def __init__(self, api: AlgoBullsAPI, max_concurrency: int = None):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            api: AlgoBullsAPI object whose session and strategy keys are shared
+            max_concurrency: maximum number of requests in flight at once; defaults to the connection pool size of `api`
+        """
+        self.api = api
+        self.max_concurrency = max_concurrency or api.pool_size
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='algobulls-api')
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def gather(self, *coroutines, limit: int = None, return_exceptions: bool = False) -> list:
+        """
+        Await many coroutines with at most `limit` of them running at once
+
+        Args:
+            coroutines: coroutines returned by the methods of this class
+            limit: maximum number of coroutines running at once; defaults to `max_concurrency`
+            return_exceptions: if True, exceptions are returned in place of results instead of being raised
+
+        Returns:
+            results, in the same order as `coroutines`
+        """
+
+        semaphore = asyncio.Semaphore(limit or self.max_concurrency)
+
+        async def _bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(*[_bounded(_) for _ in coroutines], return_exceptions=return_exceptions)
+
+    def close(self):
+        """
+        Shut down the thread pool. The shared HTTP session is left open.
+        """
+
+        self._executor.shutdown(wait=False)
+
+    async def get_job_status(self, strategy_code: str, trading_type: TradingType) -> dict:
+        """
+        Coroutine version of `AlgoBullsAPI.get_job_status`
+        """
+
+        return await self._run(self.api.get_job_status, strategy_code=strategy_code, trading_type=trading_type)
+
+    async def get_logs(self, strategy_code: str, trading_type: TradingType, initial_next_token: str = None) -> dict:
+        """
+        Coroutine version of `AlgoBullsAPI.get_logs`
+        """
+
+        return await self._run(self.api.get_logs, strategy_code=strategy_code, trading_type=trading_type, initial_next_token=initial_next_token)
+
+    async def get_reports(self, strategy_code: str, trading_type: TradingType, report_type: TradingReportType, country: str, current_page: int, raw: bool = False) -> [dict, bytes]:
+        """
+        Coroutine version of `AlgoBullsAPI.get_reports`
+        """
+
+        return await self._run(self.api.get_reports, strategy_code=strategy_code, trading_type=trading_type, report_type=report_type, country=country, current_page=current_page, raw=raw)
+
+    async def search_instrument(self, tradingsymbol: str, exchange: str) -> dict:
+        """
+        Coroutine version of `AlgoBullsAPI.search_instrument`
+        """
+
+        return await self._run(self.api.search_instrument, tradingsymbol=tradingsymbol, exchange=exchange)
+
+    async def set_strategy_config(self, strategy_code: str, strategy_config: dict, trading_type: TradingType) -> (str, dict):
+        """
+        Coroutine version of `AlgoBullsAPI.set_strategy_config`
+        """
+
+        return await self._run(self.api.set_strategy_config, strategy_code=strategy_code, strategy_config=strategy_config, trading_type=trading_type)
+
+    async def start_strategy_algotrading(self, strategy_code: str, start_timestamp: dt, end_timestamp: dt, trading_type: TradingType, lots: int, location: str, initial_funds_virtual=1e9, broker_details: dict = None) -> dict:
+        """
+        Coroutine version of `AlgoBullsAPI.start_strategy_algotrading`
+        """
+
+        return await self._run(self.api.start_strategy_algotrading, strategy_code=strategy_code, start_timestamp=start_timestamp, end_timestamp=end_timestamp, trading_type=trading_type, lots=lots, location=location,
+                               initial_funds_virtual=initial_funds_virtual, broker_details=broker_details)
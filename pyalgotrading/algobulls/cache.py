@@ -0,0 +1,145 @@
+"""
+Module for small on-disk caches of values fetched from the [AlgoBulls](https://www.algobulls.com) backend.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.pyalgotrading', 'cache')
+
+
+class JSONFileCache:
+    """
+    String-keyed cache persisted as a JSON file, with an optional time-to-live for its entries.
+    Without a path, the cache lives in memory only.
+
+    Writes go to a temporary file which then replaces the cache file, so concurrent readers (in other threads or processes) always see a complete file.
+    Changes made by other processes are picked up when the file modification time changes.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, daily: bool = False):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            path: path of the JSON file; it is created on the first write. None means the entries are kept in memory only
+            ttl: time-to-live (in seconds) of an entry; None means entries never expire
+            daily: if True, entries also expire at the first (local) midnight after they were stored
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self.daily = daily
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._mtime = None
+
+    def _is_expired(self, entry) -> bool:
+        if self.daily and date.fromtimestamp(entry['timestamp']) != date.today():
+            return True
+        return self.ttl is not None and time.time() - entry['timestamp'] > self.ttl
+
+    def _reload(self):
+        # Re-read the file if it was changed since it was last read
+        if self.path is None:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+            self._mtime = mtime
+
+    def _save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({k: v for k, v in self._entries.items() if not self._is_expired(v)}, f)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, key: str, default=None):
+        """
+        Fetch a value
+
+        Args:
+            key: key of the entry
+            default: value returned if the entry is absent or expired
+
+        Returns:
+            cached value or default
+        """
+
+        with self._lock:
+            self._reload()
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry):
+                return default
+            return entry['value']
+
+    def keys(self) -> list:
+        """
+        Fetch the keys of the entries which have not expired
+
+        Returns:
+            list of keys
+        """
+
+        with self._lock:
+            self._reload()
+            return [k for k, v in self._entries.items() if not self._is_expired(v)]
+
+    def set(self, key: str, value):
+        """
+        Store a value
+
+        Args:
+            key: key of the entry
+            value: JSON serializable value
+        """
+
+        self.update({key: value})
+
+    def update(self, values: dict):
+        """
+        Store many values with a single write of the file
+
+        Args:
+            values: dict of key to JSON serializable value
+        """
+
+        with self._lock:
+            self._reload()
+            now = time.time()
+            self._entries.update({k: {'value': v, 'timestamp': now} for k, v in values.items()})
+            self._save()
+
+    def invalidate(self, key: str = None):
+        """
+        Remove an entry, or all the entries
+
+        Args:
+            key: key of the entry to be removed; None removes all the entries
+        """
+
+        with self._lock:
+            self._reload()
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._save()
@@ -0,0 +1,108 @@
+"""
+Module for coalescing identical concurrent calls to the [AlgoBulls](https://www.algobulls.com) backend.
+"""
+import threading
+import time
+from collections import deque
+
+
+class _Call:
+    # A call in flight; waiters block on `event` and then read `result` or `exception`
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+        self.timestamp = None
+
+
+class RequestCoalescer:
+    """
+    Single-flight: while a call for a key is in flight, other callers asking for the same key wait for it and share its result (or exception) instead of making their own call.
+
+    With a positive `ttl`, a completed result is also handed to callers arriving within `ttl` seconds after it completed, which absorbs bursts of identical calls.
+    The result is shared as is, hence callers should not modify it.
+    """
+
+    def __init__(self, ttl: float = 0):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            ttl: time (in seconds) for which a completed result is reused; 0 means results are shared only between calls in flight at the same time
+        """
+
+        assert ttl >= 0, f'Argument "ttl" should be a non-negative number'
+
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._completed = deque()  # (key, call) of the reusable results, in order of completion, hence of expiry
+        self.stats = {'calls': 0, 'coalesced': 0, 'reused': 0}
+
+    def do(self, key, func):
+        """
+        Call `func()`, unless an identical call is in flight or completed less than `self.ttl` seconds ago
+
+        Args:
+            key: hashable key identifying identical calls
+            func: callable taking no arguments
+
+        Returns:
+            result of the (shared) call
+
+        Raises:
+            The exception raised by the (shared) call
+        """
+
+        with self._lock:
+            self._evict()
+            call = self._calls.get(key)
+
+            if call is None:
+                call = self._calls[key] = _Call()
+                owner = True
+                self.stats['calls'] += 1
+            else:
+                owner = False
+                self.stats['coalesced' if call.timestamp is None else 'reused'] += 1
+
+        if not owner:
+            call.event.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as ex:
+            call.exception = ex
+            raise
+        finally:
+            with self._lock:
+                call.timestamp = time.monotonic()
+                # Failures are never reused, and with no ttl there is nothing to reuse
+                if call.exception is not None or self.ttl == 0:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                else:
+                    self._completed.append((key, call))
+            call.event.set()
+
+        return call.result
+
+    def _evict(self):
+        # Drop the results completed more than `ttl` seconds ago, so that they do not pile up; called with the lock held
+        now = time.monotonic()
+        while self._completed and now - self._completed[0][1].timestamp > self.ttl:
+            key, call = self._completed.popleft()
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def clear(self):
+        """
+        Forget the completed results
+        """
+
+        with self._lock:
+            self._calls = {key: call for key, call in self._calls.items() if call.timestamp is None}
+            self._completed.clear()
@@ -1,36 +1,56 @@
 """
 Module for AlgoBulls connection
 """
+import hashlib
 import inspect
+import json
 import os
 import pprint
-import re
+import threading
 import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
+from json import JSONDecodeError
 
 import pandas as pd
 import quantstats as qs
 from tabulate import tabulate
 from tqdm.auto import tqdm
 
-from .api import AlgoBullsAPI
-from .exceptions import AlgoBullsAPIBadRequestException, AlgoBullsAPIGatewayTimeoutErrorException, AlgoBullsAPIUnauthorizedErrorException
+from .api import AlgoBullsAPI, json_loads
+from .api_async import AsyncAlgoBullsAPI
+from .cache import JSONFileCache
+from .polling import AdaptivePoller
+from .log_parser import LogTable, get_last_log_timestamp
+from .log_spool import LogSpool, LogSpoolReader, get_spool_path
+from .order_history import OrderHistoryTable
+from .job_queue import JobQueue
+from .exceptions import AlgoBullsAPIBaseException, AlgoBullsAPIBadRequestException, AlgoBullsAPIUnauthorizedErrorException
 from ..constants import StrategyMode, TradingType, TradingReportType, CandleInterval, AlgoBullsEngineVersion, Country, ExecutionStatus, EXCHANGE_LOCALE_MAP, Locale, CandleIntervalSecondsMap
 from ..strategy.strategy_base import StrategyBase
-from ..utils.func import get_valid_enum_names, get_datetime_with_tz, calculate_brokerage, calculate_slippage
+from ..utils.func import get_valid_enum_names, get_datetime_with_tz, calculate_brokerage, calculate_slippage, get_columns_from_records, get_parameter_grid, get_pnl_metrics
 
 
 class AlgoBullsConnection:
     """
     Class for AlgoBulls connection
     """
+    STRATEGY_CATALOGUE_TTL = 300
 
-    def __init__(self):
+    def __init__(self, pool_size=AlgoBullsAPI.DEFAULT_POOL_SIZE, max_retries=AlgoBullsAPI.DEFAULT_MAX_RETRIES, keep_alive=True, base_url=AlgoBullsAPI.SERVER_ENDPOINT, cache_dir=None):
         """
         Init method that is used while creating an object of this class
+
+        Args:
+            pool_size: maximum number of persistent HTTP connections kept open to the platform
+            max_retries: number of times a failed connection attempt is retried
+            keep_alive: if True, HTTP connections are reused across API calls
+            base_url: base url of the AlgoBulls backend; point this to a FakeAlgoBullsServer for offline load and latency testing
+            cache_dir: if given, values which rarely change (like strategy keys) are cached in this directory across sessions; say `pyalgotrading.algobulls.cache.DEFAULT_CACHE_DIR`
         """
-        self.api = AlgoBullsAPI(self)
+        self.api = AlgoBullsAPI(self, pool_size=pool_size, max_retries=max_retries, keep_alive=keep_alive, base_url=base_url, cache_dir=cache_dir)
+        self.async_api = AsyncAlgoBullsAPI(self.api)  # coroutine versions of the API calls, sharing the session of self.api
 
         self.saved_parameters = {
             'start_timestamp_map': {},
@@ -46,6 +66,15 @@ class AlgoBullsConnection:
         self.backtesting_pnl_data = None
         self.papertrade_pnl_data = None
         self.realtrade_pnl_data = None
+        self.start_job_timings = None  # step to start offset & duration (in seconds) of the last start_job()
+
+        self.strategy_catalogue_ttl = self.STRATEGY_CATALOGUE_TTL  # seconds for which the list of strategies is reused before being fetched again
+        self.__strategy_catalogue = None
+        self.__strategy_catalogue_lock = threading.Lock()
+
+        # "<EXCHANGE>:<TRADING_SYMBOL>" to instrument id; instrument ids can change across trading days (say, on contract rollover), hence entries expire daily
+        instrument_cache_path = os.path.join(cache_dir, f'instruments_{hashlib.sha256(self.api.base_url.encode()).hexdigest()[:16]}.json') if cache_dir is not None else None
+        self.instrument_cache = JSONFileCache(path=instrument_cache_path, daily=True)
 
     @staticmethod
     def get_authorization_url():
@@ -81,16 +110,17 @@ class AlgoBullsConnection:
         """
         assert isinstance(access_token, str), f'Argument "access_token" should be a string'
         self.api.set_access_token(access_token)
+        self.invalidate_strategy_catalogue()
 
         if validate_token:
             try:
-                _ = self.api.get_all_strategies()
+                _ = self.get_strategy_catalogue(force_fetch=True)
                 print("Access token is valid.")
             except AlgoBullsAPIUnauthorizedErrorException:
                 print(f"Access token is invalid. ", end='')
                 self.get_token_url()
 
-    def create_strategy(self, strategy, overwrite=False, strategy_code=None, abc_version=None):
+    def create_strategy(self, strategy, overwrite=False, strategy_code=None, abc_version=None, strategy_name=None):
         """
         Method to upload new strategy.
 
@@ -110,6 +140,7 @@ class AlgoBullsConnection:
             overwrite: A boolean variable
             strategy_code: Strategy code
             abc_version: ABC version
+            strategy_name: name to upload the strategy under; defaults to the name of the strategy
         """
 
         # Sanity checks
@@ -123,7 +154,7 @@ class AlgoBullsConnection:
         # strategy()
 
         # Get source code, and upload as new strategy (if strategy_code is None) else edit same strategy
-        strategy_name = strategy.name if isinstance(strategy.name, str) else strategy.name()
+        strategy_name = strategy_name or (strategy.name if isinstance(strategy.name, str) else strategy.name())
         strategy_details = inspect.getsource(strategy)
         versions_supported = strategy.versions_supported() if hasattr(strategy, 'versions_supported') else AlgoBullsEngineVersion.VERSION_3_3_0
 
@@ -138,19 +169,17 @@ class AlgoBullsConnection:
         if overwrite is False:
             response = self.api.create_strategy(strategy_name=strategy_name, strategy_details=strategy_details, abc_version=_abc_version)
         else:
-            response = None
-            if strategy_code:
-                _strategy_code = strategy_code
+            _strategy_code = strategy_code
+            if not _strategy_code:
+                _strategy = self.__lookup_strategy('by_name', strategy_name)
+                _strategy_code = _strategy['strategyCode'] if _strategy is not None else None
+            if _strategy_code:
+                response = self.api.update_strategy(strategy_code=_strategy_code, strategy_name=strategy_name, strategy_details=strategy_details, abc_version=_abc_version)
             else:
-                _ = self.get_all_strategies(return_as_dataframe=False)
-                try:
-                    _strategy_code = {_dict['strategyName']: _dict['strategyCode'] for _dict in _}[strategy_name]
-                    response = self.api.update_strategy(strategy_code=_strategy_code, strategy_name=strategy_name, strategy_details=strategy_details, abc_version=_abc_version)
-
-                except KeyError:
-                    response = self.api.create_strategy(strategy_name=strategy_name, strategy_details=strategy_details,
-                                                        abc_version=_abc_version)
+                response = self.api.create_strategy(strategy_name=strategy_name, strategy_details=strategy_details,
+                                                    abc_version=_abc_version)
 
+        self.invalidate_strategy_catalogue()
         return response
 
     def get_all_strategies(self, return_as_dataframe=True):
@@ -164,12 +193,57 @@ class AlgoBullsConnection:
             list of available strategies
         """
         response = self.api.get_all_strategies()
+        self.__set_strategy_catalogue(response)
         if isinstance(response['data'], list):
             _ = response['data']
             return pd.DataFrame(_) if return_as_dataframe else _
         else:
             return response
 
+    def __set_strategy_catalogue(self, response):
+        strategies = response.get('data') if isinstance(response, dict) else None
+        strategies = strategies if isinstance(strategies, list) else []
+        with self.__strategy_catalogue_lock:
+            self.__strategy_catalogue = {
+                'timestamp': time.monotonic(),
+                'strategies': strategies,
+                'by_code': {_['strategyCode']: _ for _ in strategies if 'strategyCode' in _},
+                'by_name': {_['strategyName']: _ for _ in strategies if 'strategyName' in _},
+            }
+            return self.__strategy_catalogue
+
+    def get_strategy_catalogue(self, force_fetch=False):
+        """
+        Fetch the list of strategies of the user, reusing the last fetched list while it is younger than `self.strategy_catalogue_ttl` seconds
+
+        Args:
+            force_fetch: if True, the list is fetched from the platform even if a cached list is available
+
+        Returns:
+            dict with keys 'strategies' (list of strategies), 'by_code' (strategy code to strategy) and 'by_name' (strategy name to strategy)
+        """
+
+        catalogue = self.__strategy_catalogue
+        if force_fetch or catalogue is None or time.monotonic() - catalogue['timestamp'] > self.strategy_catalogue_ttl:
+            catalogue = self.__set_strategy_catalogue(self.api.get_all_strategies())
+        return catalogue
+
+    def invalidate_strategy_catalogue(self):
+        """
+        Forget the cached list of strategies, so that it is fetched again on next use
+        """
+
+        with self.__strategy_catalogue_lock:
+            self.__strategy_catalogue = None
+
+    def __lookup_strategy(self, index, value):
+        # Look up a strategy in the catalogue; on a miss in a cached catalogue, fetch the catalogue once more, since the strategy may have been created after it was cached
+        fetched = self.__strategy_catalogue is None
+        strategy = self.get_strategy_catalogue()[index].get(value)
+        if strategy is None and not fetched:
+            strategy = self.get_strategy_catalogue(force_fetch=True)[index].get(value)
+        return strategy
+
     def get_strategy_name(self, strategy_code):
         """
         Fetch the name of the strategy using strategy-code
@@ -182,9 +256,7 @@ class AlgoBullsConnection:
         """
         strategy_name = None
         try:
-            # TODO: Currently fetching strategy name over API everytime. Will be optimized in future to avoid repeated API calls.
-            all_strategies_df = self.get_all_strategies()
-            strategy_name = all_strategies_df.loc[all_strategies_df['strategyCode'] == strategy_code].iloc[0]['strategyName']
+            strategy_name = self.__lookup_strategy('by_code', strategy_code)['strategyName']
 
         except Exception as ex:
             print(f'Error while fetching strategy name of strategy code {strategy_code}. Error: {ex}')
@@ -226,6 +298,48 @@ class AlgoBullsConnection:
 
         return response
 
+    def resolve_instruments(self, instruments, max_workers=None):
+        """
+        Fetch the ids of instruments, searching for the instruments not found in `self.instrument_cache` concurrently
+
+        Args:
+            instruments: list of instruments, in the format "<EXCHANGE>:<TRADING_SYMBOL>"
+            max_workers: maximum number of concurrent searches; defaults to the size of the connection pool
+
+        Returns:
+            list of instrument ids, in the same order as instruments
+
+        Raises:
+            ValueError if an instrument is not in the expected format or is not found on the platform
+        """
+
+        assert isinstance(instruments, list) and all(isinstance(_, str) for _ in instruments), f'Argument "instruments" should be a list of strings'
+
+        malformed = [_ for _ in instruments if len(_.split(':')) != 2]
+        if malformed:
+            raise ValueError(f'ERROR: Instrument(s) {malformed} not in the expected format "<EXCHANGE>:<TRADING_SYMBOL>"')
+
+        ids = {_: self.instrument_cache.get(_) for _ in dict.fromkeys(instruments)}
+        missing = [_ for _, _id in ids.items() if _id is None]
+
+        def _search(instrument):
+            exchange, tradingsymbol = instrument.split(':')
+            response = self.api.retry_policy.call(self.api.search_instrument, tradingsymbol, exchange=exchange)
+            results = response.get('data') or []
+            # Every search returns several instruments (say, all the strikes of an option); cache all of them, since a basket often needs its neighbours next
+            self.instrument_cache.update({_['value']: _['id'] for _ in results if 'value' in _ and 'id' in _})
+            return next((_['id'] for _ in results if _.get('value') == instrument), None)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(len(missing), max_workers or self.api.pool_size)) as executor:
+                ids.update(zip(missing, executor.map(_search, missing)))
+
+        unresolved = [_ for _, _id in ids.items() if _id is None]
+        if unresolved:
+            raise ValueError(f'ERROR: Instrument(s) {unresolved} not found. You can use the \'search_instrument()\' method of AlgoBullsConnection class to search for instruments')
+
+        return [ids[_] for _ in instruments]
+
     def delete_previous_trades(self, strategy):
         """
         Delete all the previous trades and clear the pnl table
@@ -235,14 +349,14 @@ class AlgoBullsConnection:
         """
 
         response = {}
-        for _ in range(30):
-            try:
-                response = self.api.delete_previous_trades(strategy)
-                print(response.get('message'))
-                break
-            except AlgoBullsAPIGatewayTimeoutErrorException as ex:
-                print(f'Deleting previous trades... in process... (attempt {_})\n{ex}')
-                time.sleep(1)
+        try:
+            response = self.api.retry_policy.call(self.api.delete_previous_trades, strategy, max_attempts=30, deadline=30,
+                                                  on_retry=lambda attempt, ex, delay: print(f'Deleting previous trades... in process... (attempt {attempt})\n{ex}'))
+            print(response.get('message'))
+        except AlgoBullsAPIBaseException as ex:
+            if not self.api.retry_policy.is_retryable(ex):
+                raise
+            print(f'Could not delete previous trades.\n{ex}')
 
         return response
 
@@ -264,6 +378,24 @@ class AlgoBullsConnection:
         response = self.api.get_job_status(strategy_code=strategy_code, trading_type=trading_type)
         return response
 
+    def prefetch_strategy_keys(self, strategy_codes, trading_types=None, max_workers=None):
+        """
+        Fetch the keys of many strategies concurrently, say at startup, before polling their jobs
+
+        Args:
+            strategy_codes: list of strategy codes
+            trading_types: list of trading types; defaults to all the trading types
+            max_workers: maximum number of concurrent requests
+
+        Returns:
+            dict of (strategy code, trading type) to key
+        """
+
+        assert isinstance(strategy_codes, list) and all(isinstance(_, str) for _ in strategy_codes), f'Argument "strategy_codes" should be a list of strings'
+        assert trading_types is None or (isinstance(trading_types, list) and all(isinstance(_, TradingType) for _ in trading_types)), f'Argument "trading_types" should be a list of enums of type {TradingType.__name__}'
+
+        return self.api.prefetch_keys(strategy_codes=strategy_codes, trading_types=trading_types, max_workers=max_workers)
+
     def stop_job(self, strategy_code, trading_type):
         """
         Stop a running job
@@ -281,7 +413,7 @@ class AlgoBullsConnection:
 
         self.api.stop_strategy_algotrading(strategy_code=strategy_code, trading_type=trading_type)
 
-    def get_logs(self, strategy_code, trading_type, display_progress_bar=True, print_live_logs=False):
+    def get_logs(self, strategy_code, trading_type, display_progress_bar=True, print_live_logs=False, poller=None):
         """
         Fetch logs for a strategy
 
@@ -290,27 +422,112 @@ class AlgoBullsConnection:
             trading_type: trading type
             display_progress_bar: to track the execution progress bar as your strategy is executed
             print_live_logs: to print the logs as they are fetched
+            poller: AdaptivePoller scheduling the polls; see `iter_logs()`
         Returns:
             Execution logs
         """
 
+        pages = [''.join(logs) for logs in self.iter_logs(strategy_code, trading_type, display_progress_bar=display_progress_bar, print_live_logs=print_live_logs, poller=poller)]
+        return ''.join(pages)
+
+    def get_logs_table(self, strategy_code, trading_type, display_progress_bar=True, poller=None):
+        """
+        Fetch logs for a strategy as structured records, parsing every page as it is fetched
+
+        Args:
+            strategy_code: strategy code
+            trading_type: trading type
+            display_progress_bar: to track the execution progress bar as your strategy is executed
+            poller: AdaptivePoller scheduling the polls; see `iter_logs()`
+
+        Returns:
+            LogTable; use its `to_dataframe()` method for filtering and aggregating the records
+        """
+
+        table = LogTable()
+        for logs in self.iter_logs(strategy_code, trading_type, display_progress_bar=display_progress_bar, poller=poller):
+            table.extend(logs)
+        return table
+
+    def spool_logs(self, strategy_code, trading_type, directory, run_id=None, display_progress_bar=False, print_live_logs=False, **spool_kwargs):
+        """
+        Fetch logs for a strategy into a compressed, rotating spool on disk, instead of into memory; meant for long Paper Trading / Real Trading sessions
+
+        Every flushed chunk of the spool records the `nextForwardToken` following it, so a spool of an existing run is resumed from its last checkpoint (say, after a restart of the process),
+        and only the logs after it are fetched.
+
+        Args:
+            strategy_code: strategy code
+            trading_type: trading type
+            directory: root directory of the spools; the logs go to `<directory>/<strategy_code>/<trading_type>/<run_id>`
+            run_id: id of the run; defaults to the current local time. Pass the id of an existing run to resume it
+            display_progress_bar: to track the execution progress bar as your strategy is executed
+            print_live_logs: to print the logs as they are fetched
+            spool_kwargs: buffering, rotation and fsync options passed on to `LogSpool`
+
+        Returns:
+            LogSpoolReader for reading, tailing or seeking the spooled logs
+        """
+
+        run_id = run_id or dt.now().strftime('%Y%m%d_%H%M%S')
+        path = get_spool_path(directory, strategy_code, trading_type, run_id)
+        with LogSpool(path, **spool_kwargs) as spool:
+            if spool.next_token is not None:
+                print(f'Resuming the logs after line {spool.line_count} of the spool.')
+            elif spool.line_count:
+                print(f'WARNING: The spool has no checkpoint to resume from; the logs will be appended from the beginning.')
+            for logs, next_token in self.iter_logs(strategy_code, trading_type, display_progress_bar=display_progress_bar, print_live_logs=print_live_logs, initial_next_token=spool.next_token,
+                                                   return_next_token=True):
+                spool.write(logs, next_token=next_token)
+
+        return LogSpoolReader(path)
+
+    def __get_job_status_message(self, strategy_code, trading_type):
+        # Job status polls are retried on gateway timeouts and server errors, same as the log pages
+        response = self.api.retry_policy.call(self.api.get_job_status, strategy_code=strategy_code, trading_type=trading_type,
+                                              on_retry=lambda attempt, ex, delay: tqdm.write(f"\n{'----' * 10}\nFaced an error while fetching the job status. Retrying in {delay:.1f} seconds...\n{'----' * 10}\n"))
+        return response["message"]
+
+    def iter_logs(self, strategy_code, trading_type, display_progress_bar=False, print_live_logs=False, poller=None, initial_next_token=None, return_next_token=False):
+        """
+        Fetch logs for a strategy, page by page, as the strategy is executed
+
+        Pages are yielded as soon as they are fetched, and only the current page is held in memory. The generator returns once the job has stopped and all its logs are fetched.
+
+        Args:
+            strategy_code: strategy code
+            trading_type: trading type
+            display_progress_bar: to track the execution progress bar as your strategy is executed
+            print_live_logs: to print the logs as they are fetched
+            poller: AdaptivePoller scheduling the polls; by default, full pages are followed right away and empty pages back off, up to the next candle boundary for PT/RT.
+                Pass one to inspect its stats (polls made, catch-up latency) afterwards
+            initial_next_token: `nextForwardToken` to resume from, as yielded with `return_next_token`; None fetches the logs from the beginning
+            return_next_token: if True, every page is yielded along with the `nextForwardToken` following it, which can be saved as a checkpoint to resume from
+
+        Yields:
+            list of log lines, or a tuple of the list of log lines and the next token if `return_next_token` is True
+        """
+
         assert isinstance(strategy_code, str), f'Argument "strategy_code" should be a string'
         assert isinstance(trading_type, TradingType), f'Argument "trading_type" should be an enum of type {TradingType.__name__}'
 
         # TODO: to extract timestamp from a different source which will be independent of whether save parameters are present in the object
         start_timestamp_map = self.saved_parameters.get('start_timestamp_map')
         end_timestamp_map = self.saved_parameters.get('end_timestamp_map')
-        sleep_time = 1
         total_seconds = 1
 
-        # calculate the sleep time for RT and PT
-        if trading_type is not TradingType.BACKTESTING:
-            try:
-                sleep_time = CandleIntervalSecondsMap[self.saved_parameters.get('candle_interval').value]
-                print(f"Your candle interval is {self.saved_parameters.get('candle_interval').value}, therefore logs will be fetched every {sleep_time} seconds.")
-            except AttributeError:
-                print("WARNING: Could not fetch the candle interval from saved parameters. Logs will be fetched every 60 seconds.")
-                sleep_time = 60
+        # for RT and PT, new logs come in at candle boundaries; polls back off on empty pages up to the next candle boundary
+        if poller is None:
+            if trading_type is not TradingType.BACKTESTING:
+                try:
+                    candle_seconds = CandleIntervalSecondsMap[self.saved_parameters.get('candle_interval').value]
+                    print(f"Your candle interval is {self.saved_parameters.get('candle_interval').value}, therefore logs will be fetched at least once every {candle_seconds} seconds.")
+                except AttributeError:
+                    print("WARNING: Could not fetch the candle interval from saved parameters. Logs will be fetched at least once every 60 seconds.")
+                    candle_seconds = 60
+                poller = AdaptivePoller(max_interval=candle_seconds, candle_interval=candle_seconds)
+            else:
+                poller = AdaptivePoller()
 
         # initialize the parameters required for displaying progress bar
         if display_progress_bar:
@@ -322,105 +539,91 @@ class AlgoBullsConnection:
                 display_progress_bar = False
 
         # initialize all the variables
-        all_logs = ''
         tqdm_progress_bar = None
-        initial_next_token = None
         error_counter = 0
         status = None
         count_starting_status = 0
         response = {}
         logs = []
 
-        while True:
-            # if logs are in starting phase, we wait until it changes
-            if status is None or status == ExecutionStatus.STARTING.value:
-                status = self.get_job_status(strategy_code, trading_type)["message"]
-                time.sleep(5)
-
-                # log the counting for "STARTING" phase of execution
-                if status == ExecutionStatus.STARTING.value:
-                    count_starting_status += 1
-                    print('\r', end=f'Looking for a dedicated virtual server to execute your strategy... ({count_starting_status})')
-                continue
-
-            # if logs get in started phase, we initialize the tqdm object for progress tracking
-            if display_progress_bar:
-                if tqdm_progress_bar is None and status == ExecutionStatus.STARTED.value:
-                    tqdm_progress_bar = tqdm(desc='Execution Progress', total=total_seconds, position=0, leave=True, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]')
-
-            # try the logs API 5 times or until it succeeds
-            for i in range(5):
+        try:
+            while True:
+                # if logs are in starting phase, we wait until it changes
+                if status is None or status == ExecutionStatus.STARTING.value:
+                    status = self.__get_job_status_message(strategy_code, trading_type)
+
+                    # log the counting for "STARTING" phase of execution
+                    if status == ExecutionStatus.STARTING.value:
+                        count_starting_status += 1
+                        print('\r', end=f'Looking for a dedicated virtual server to execute your strategy... ({count_starting_status})')
+                        poller.wait(poller.on_empty())
+                    continue
+
+                # if logs get in started phase, we initialize the tqdm object for progress tracking
+                if display_progress_bar:
+                    if tqdm_progress_bar is None and status == ExecutionStatus.STARTED.value:
+                        tqdm_progress_bar = tqdm(desc='Execution Progress', total=total_seconds, position=0, leave=True, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]')
+
+                # fetch the next page of logs, retrying on gateway timeouts and server errors
                 try:
-                    response = self.api.get_logs(strategy_code=strategy_code, trading_type=trading_type, initial_next_token=initial_next_token)
+                    response = self.api.retry_policy.call(self.api.get_logs, strategy_code=strategy_code, trading_type=trading_type, initial_next_token=initial_next_token,
+                                                          on_retry=lambda attempt, ex, delay: tqdm.write(f"\n{'----' * 10}\nFaced an error while fetching logs. Retrying in {delay:.1f} seconds...\n{'----' * 10}\n"))
                     logs = response.get('data')
-                    if logs:
-                        break
-                except AlgoBullsAPIGatewayTimeoutErrorException:
+                    initial_next_token = response.get('nextForwardToken', initial_next_token)
+                except AlgoBullsAPIBaseException as ex:
+                    if not self.api.retry_policy.is_retryable(ex):
+                        raise
                     tqdm.write(f"\n{'----' * 10}\nFaced an error while fetching logs.\n{'----' * 10}\n")
-                    time.sleep(5)
+                    logs = []
 
-            initial_next_token = response.get('nextForwardToken')
+                # if logs are empty we validate the status of execution
+                if not logs:
+                    status = self.__get_job_status_message(strategy_code, trading_type)
 
-            # if logs are empty we validate the status of execution
-            if not logs:
-                status = self.get_job_status(strategy_code, trading_type)["message"]
+                    # if status is stopped we stop iterating
+                    if status in [ExecutionStatus.STOPPED.value, ExecutionStatus.STOPPING.value]:
+                        # tqdm.write(f"INFO: Got status as {status}, strategy execution completed.")    # for debug
+                        return
 
-                # if status is stopped we break the while loop
-                if status in [ExecutionStatus.STOPPED.value, ExecutionStatus.STOPPING.value]:
+                    # continue if logs are not fetched
+                    else:
+                        poller.wait(poller.on_empty())
 
-                    # tqdm.write(f"INFO: Got status as {status}, strategy execution completed.")    # for debug
-                    if display_progress_bar:
-                        if tqdm_progress_bar is not None:
-                            tqdm_progress_bar.close()
-                    break
+                        # tqdm.write(f"WARNING: got no data, current status is {status}...")      # for debug
+                        continue
 
-                # continue if logs are not fetched
                 else:
-                    time.sleep(5)
-
-                    # tqdm.write(f"WARNING: got no data, current status is {status}...")      # for debug
-                    continue
-
-            else:
-                # incoming logs are in list, merge them to string
-                if type(logs) is list and initial_next_token:
-                    all_logs += ''.join(logs)
+                    # print the logs below progressbar
+                    if print_live_logs:
+                        tqdm.write(''.join(logs))
 
-                # print the logs below progressbar
-                if print_live_logs:
-                    tqdm.write(''.join(logs))
-
-                # iterate in reverse order
-                if display_progress_bar:
-                    for log in logs[::-1]:
+                    # update the progress from the timestamp of the last log line having one
+                    if display_progress_bar and tqdm_progress_bar is not None:
                         try:
-                            # extract log terms inside square brackets
-                            _ = re.findall(r'\[(.*?)\]', log)
-
-                            # extract datetime from logs
-                            if tqdm_progress_bar is not None and _[0] in ['BT', 'PT', 'RT']:
-                                current_timestamp = dt.strptime(_[1].split(',')[0], '%Y-%m-%d %H:%M:%S')
-                                total_completion = (current_timestamp - start_timestamp).total_seconds()
+                            current_timestamp = get_last_log_timestamp(logs)
+                            if current_timestamp is not None:
+                                total_completion = (current_timestamp.replace(microsecond=0) - start_timestamp).total_seconds()
                                 tqdm_progress_bar.update(total_completion - tqdm_progress_bar.n)
-                                break
 
                         except Exception as ex:
                             tqdm.write(f'WARNING: faced an error while updating logs process. Error: {ex}')
                             error_counter += 1
 
-                    # avoid infinite loop in case of error
-                    if error_counter > 5:
-                        break
+                    # incoming logs are in list, hand them over to the caller
+                    if type(logs) is list and initial_next_token:
+                        yield (logs, initial_next_token) if return_next_token else logs
 
-                if len(logs) >= self.api.page_size:
-                    # tqdm.write(f"\n{'-----' * 5}\nWaiting {sleep_time} seconds for fetching next logs ...\n{'-----' * 5}\n")  # for debug
-                    time.sleep(sleep_time)
-                else:
-                    time.sleep(1)
+                    # avoid infinite loop in case of error
+                    if display_progress_bar and error_counter > 5:
+                        return
 
-        return all_logs
+                    # a full page means more logs are waiting; fetch them right away
+                    poller.wait(poller.on_page(len(logs), self.api.page_size))
+        finally:
+            if tqdm_progress_bar is not None:
+                tqdm_progress_bar.close()
 
-    def get_report_order_history(self, strategy_code, trading_type, render_as_dataframe=False, show_all_rows=True, country=None):
+    def get_report_order_history(self, strategy_code, trading_type, render_as_dataframe=False, show_all_rows=True, country=None, max_workers=None, path=None):
         """
         Fetch report for a strategy
 
@@ -430,45 +633,54 @@ class AlgoBullsConnection:
             render_as_dataframe: True or False
             show_all_rows: True or False
             country: country of the Exchange
+            max_workers: maximum number of pages fetched concurrently, after the first one; defaults to the size of the connection pool
+            path: if given (and render_as_dataframe is False), the orders are rendered as text straight to this file, instead of into a string
 
         Returns:
-            report details
+            report details; an `OrderHistoryTable` if path is given, which can render any page of the orders with `render()`
         """
 
         assert isinstance(strategy_code, str), f'Argument "strategy_code" should be a string'
         assert isinstance(trading_type, TradingType), f'Argument "trading_type" should be an enum of type {TradingType.__name__}'
         assert isinstance(render_as_dataframe, bool), f'Argument "render_as_dataframe" should be a bool'
         assert isinstance(show_all_rows, bool), f'Argument "show_all_rows" should be a bool'
+        assert max_workers is None or (isinstance(max_workers, int) and max_workers > 0), f'Argument "max_workers" should be None or a positive integer'
         # assert (broker is None or isinstance(broker, AlgoBullsSupportedBrokers) is True), f'Argument broker should be None or an enum of type {AlgoBullsSupportedBrokers.__name__}'
 
-        main_data = []
-        total_data = 0
-        _total = 0
-        i = 1
-
         if country is None:
             country = self.strategy_country_map[trading_type].get(strategy_code, Country.DEFAULT.value)
 
-        while True:
-            for _ in range(5):
-                try:
-                    response = self.api.get_reports(strategy_code=strategy_code, trading_type=trading_type, report_type=TradingReportType.ORDER_HISTORY, country=country, current_page=i)
-                    _total = response.get("totalTrades")
-                    _data = response.get("data")
+        def _get_page(current_page):
+            # retry on gateway timeouts and server errors, and while the page is not available yet, for up to 25 seconds as before (5 attempts, 5 seconds apart); every page is retried on its own
+            response = self.api.retry_policy.call(self.api.get_reports, strategy_code=strategy_code, trading_type=trading_type, report_type=TradingReportType.ORDER_HISTORY, country=country, current_page=current_page,
+                                                  max_attempts=10, deadline=25, retry_if_result=lambda _: not (_.get("data") and isinstance(_.get("data"), list)))
+            _data = response.get("data")
+            return response, (_data if _data and isinstance(_data, list) else None)
 
-                    # if data is retrieved as a list then update the main data
-                    if _data and isinstance(_data, list):
+        # the first page gives the total number of orders, hence the number of pages; the remaining pages are fetched concurrently and reassembled in order
+        main_data = []
+        response, _data = _get_page(1)
+        if _data is not None:
+            main_data.extend(_data)
+            _total = response.get("totalTrades") or 0
+            pages = -(-_total // self.api.page_size)
+            if pages > 1:
+                with ThreadPoolExecutor(max_workers=min(pages - 1, max_workers or self.api.pool_size), thread_name_prefix='algobulls-order-history') as executor:
+                    futures = [executor.submit(_get_page, _) for _ in range(2, pages + 1)]
+                    for page, future in enumerate(futures, start=2):
+                        try:
+                            _data = future.result()[1]
+                        except Exception as ex:
+                            print(f'WARNING: Could not fetch page {page} of the order history.\n{ex}')
+                            _data = None
+
+                        # stop at the first page not available (yet), returning the pages before it
+                        if _data is None:
+                            print(f'WARNING: Page {page} of the order history is not available; fetched {len(main_data)} of {_total} orders.')
+                            for _ in futures:
+                                _.cancel()
+                            break
                         main_data.extend(_data)
-                        total_data += self.api.page_size
-                        i += 1
-                        break
-
-                except AlgoBullsAPIGatewayTimeoutErrorException:
-                    time.sleep(5)
-
-            # break if total requested data is more than total data
-            if total_data > _total:
-                break
 
         if main_data:
 
@@ -476,31 +688,17 @@ class AlgoBullsConnection:
             if render_as_dataframe:
                 pandas_dataframe_all_rows()
 
-                # explode the "customer_tradebook_states" column to get separate rows for every state
-                _response = pd.DataFrame(main_data)
-                df = _response.explode('customer_tradebook_states').reset_index(drop=True)
-                df = df.join(pd.json_normalize(df.pop('customer_tradebook_states')))
-                _response = df.set_index("orderId").sort_values("timestamp_created")[["timestamp_created", "transaction_type", "state", "instrument", "quantity", "currency", "price"]]
+                # typed columns built directly from the records, with one row for every state of an order
+                _response = OrderHistoryTable(main_data).to_dataframe()
 
-            # for rendering as string or json
+            # for rendering as string, or streaming to a file
             else:
-                _response = main_data
-                main_order_string = ""
-
-                for i in range(len(main_data)):
-                    # tables for displaying order details and order stats
-                    order_detail = [
-                        ["Order ID", main_data[i]["orderId"]],
-                        ["Transaction Type", main_data[i]["transaction_type"]],
-                        ["Instrument", main_data[i]["instrument"]],
-                        ["Quantity", main_data[i]["quantity"]],
-                        ["Price", str(main_data[i]["currency"]) + str(main_data[i]["price"])]
-                    ]
-                    main_order_string += tabulate(order_detail, tablefmt="psql") + "\n"
-                    main_order_string += tabulate(main_data[i]["customer_tradebook_states"], headers="keys", tablefmt="psql") + "\n"
-                    main_order_string += '\n' + '======' * 15 + '\n'
-
-                _response = main_order_string
+                _response = OrderHistoryTable(main_data)
+                if path is not None:
+                    _response.write(path)
+                else:
+                    _response = _response.render()
+
             return _response
         else:
             print("Report not available yet. Please retry in sometime")
@@ -528,9 +726,12 @@ class AlgoBullsConnection:
         if country is None:
             country = self.strategy_country_map[trading_type].get(strategy_code, Country.DEFAULT.value)
 
-        # Fetch the data
-        response = self.api.get_reports(strategy_code=strategy_code, trading_type=trading_type, report_type=TradingReportType.PNL_TABLE, country=country, current_page=1)
-        data = response.get("data")
+        # Fetch the data undecoded, and decode it (with orjson, if installed) straight into the records the columns are built from
+        content = self.api.get_reports(strategy_code=strategy_code, trading_type=trading_type, report_type=TradingReportType.PNL_TABLE, country=country, current_page=1, raw=True)
+        try:
+            data = json_loads(content).get("data")
+        except (JSONDecodeError, AttributeError):
+            data = None
 
         if show_all_rows:
             pandas_dataframe_all_rows()
@@ -556,7 +757,7 @@ class AlgoBullsConnection:
 
         if data:
             # Generate df from json data & perform cleanups
-            _df = pd.json_normalize(data[::-1])[list(column_rename_map.keys())].rename(columns=column_rename_map)
+            _df = pd.DataFrame(get_columns_from_records(data[::-1], column_rename_map))
             _df[['entry_timestamp', 'exit_timestamp']] = _df[['entry_timestamp', 'exit_timestamp']].apply(pd.to_datetime, format="%Y-%m-%d | %H:%M %z", errors="coerce")
             _df['entry_transaction_type'] = _df['entry_transaction_type'].apply(lambda _: 'BUY' if _ else 'SELL')
             _df['exit_transaction_type'] = _df['exit_transaction_type'].apply(lambda _: 'BUY' if _ else 'SELL')
@@ -643,8 +844,7 @@ class AlgoBullsConnection:
         if html_dump:
             # if there is an error in calling the API, give a default name to html file.
             try:
-                all_strategies = self.get_all_strategies()
-                strategy_name = all_strategies.loc[all_strategies['strategyCode'] == strategy_code]['strategyName'].iloc[0]
+                strategy_name = self.__lookup_strategy('by_code', strategy_code)['strategyName']
             except Exception:
                 strategy_name = 'strategy_results'
             qs.reports.html(total_funds_series, title=strategy_name, output='', download_filename=f'report_{strategy_name}_{time.time():.0f}.html')
@@ -680,10 +880,14 @@ class AlgoBullsConnection:
         print(f"\nStarting the strategy '{strategy_name}' in {trading_type.name} mode...\n{_msg}\n")
 
     def start_job(self, strategy_code=None, start_timestamp=None, end_timestamp=None, instruments=None, lots=None, strategy_parameters=None, candle_interval=None, strategy_mode=None, initial_funds_virtual=None, delete_previous_trades=True,
-                  trading_type=None, broking_details=None, **kwargs):
+                  trading_type=None, broking_details=None, pipelined=False, **kwargs):
         """
         Submit a BT/PT/RT job for a strategy on the AlgoBulls Platform
 
+        The time taken by every step of the submission is saved in `self.start_job_timings`.
+        With `pipelined`, the steps independent of each other run concurrently, and the timings are printed: the instrument search and the strategy key fetch while the config is printed,
+        then the deletion of previous trades while the config is set. The previous trades are deleted only once the instruments and the key are resolved.
+
         Args:
             strategy_code: Strategy code
             start_timestamp: Start date-time/time
@@ -697,6 +901,7 @@ class AlgoBullsConnection:
             initial_funds_virtual: virtual funds allotted before the backtesting starts
             trading_type: type of trading : PT/BT/RT
             broking_details: details of client's broker
+            pipelined: if True, run the independent steps of the submission concurrently, cutting the launch latency
 
         Legacy args (will be deprecated in future release):
             'strategy_code' behaves same as 'strategy'
@@ -798,55 +1003,196 @@ class AlgoBullsConnection:
             print('Warning: Valid exchange not given, assuming exchange as "NSE_EQ".\n Expected format for giving an instrument "<EXCHANGE>:<TRADING_SYMBOL>"\nPossible exchange values include: {EXCHANGE_LOCALE_MAP.keys()}')
             location = EXCHANGE_LOCALE_MAP[Locale.DEFAULT.value]
 
-        # generate instruments' id list
-        instrument_list = []
-        for _instrument in instruments:
-            exchange, tradingsymbol = _instrument.split(':')
-            instrument_results = self.search_instrument(instrument=tradingsymbol, exchange=exchange)
-            for _ in instrument_results:
-                if _["value"] == _instrument:
-                    instrument_list.append({'id': _["id"]})
-                    break
-
-        # save BT/PT/RT parameters
-        self.saved_parameters = {
-            'strategy_code': strategy_code,
-            'start_timestamp_map': start_timestamp_map,
-            'end_timestamp_map': end_timestamp_map,
-            'strategy_parameters': strategy_parameters,
-            'candle_interval': candle_interval,
-            'instruments': instruments,
-            'strategy_mode': strategy_mode,
-            'lots': lots,
-            'initial_funds_virtual': initial_funds_virtual,
-            'vendor_details': broking_details  # Note: key name is saved as vendor_details for logging purpose
-        }
-
-        self.print_strategy_config(trading_type)
-
-        # delete previous trades
-        if delete_previous_trades and trading_type in [TradingType.BACKTESTING, TradingType.PAPERTRADING]:
-            self.delete_previous_trades(strategy_code)
-
-        # Setup config for starting the job
-        strategy_config = {
-            'instruments': {
-                'instruments': instrument_list
-            },
-            'lots': lots,
-            'userParams': restructured_strategy_parameters,
-            'candleDuration': candle_interval.value,
-            'strategyMode': strategy_mode.value
-        }
-        self.api.set_strategy_config(strategy_code=strategy_code, strategy_config=strategy_config, trading_type=trading_type)
+        start_job_timings = OrderedDict()
+        started_at = time.monotonic()
 
-        # Submit trading job
-        response = self.api.start_strategy_algotrading(strategy_code=strategy_code, start_timestamp=start_timestamp, end_timestamp=end_timestamp, trading_type=trading_type,
-                                                       lots=lots, initial_funds_virtual=initial_funds_virtual, broker_details=broking_details, location=location)
+        def _run_step(step, func, *args, **kwargs):
+            # run a step of the submission, recording when it started and how long it took
+            step_started_at = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                start_job_timings[step] = {'start': step_started_at - started_at, 'duration': time.monotonic() - step_started_at}
+
+        executor = ThreadPoolExecutor(max_workers=4 if pipelined else 1, thread_name_prefix='algobulls-start-job')
+
+        def _submit_step(step, func, *args, **kwargs):
+            # run a step on the executor; sequentially, unless pipelined
+            future = executor.submit(_run_step, step, func, *args, **kwargs)
+            if not pipelined:
+                future.result()
+            return future
+
+        with executor:
+            # generate instruments' id list
+            instrument_ids = _submit_step('search_instruments', self.resolve_instruments, instruments)
+
+            # save BT/PT/RT parameters
+            self.saved_parameters = {
+                'strategy_code': strategy_code,
+                'start_timestamp_map': start_timestamp_map,
+                'end_timestamp_map': end_timestamp_map,
+                'strategy_parameters': strategy_parameters,
+                'candle_interval': candle_interval,
+                'instruments': instruments,
+                'strategy_mode': strategy_mode,
+                'lots': lots,
+                'initial_funds_virtual': initial_funds_virtual,
+                'vendor_details': broking_details  # Note: key name is saved as vendor_details for logging purpose
+            }
+
+            # the key is fetched by set_strategy_config, unless fetched here in advance
+            strategy_key = _submit_step('fetch_strategy_key', self.api.prefetch_keys, [strategy_code], [trading_type]) if pipelined else None
+
+            # the config is printed while the instruments and the key are resolved
+            _run_step('print_strategy_config', self.print_strategy_config, trading_type)
+
+            # previous trades are deleted only once the instruments and the key are resolved, since a bad instrument or strategy code would fail the job after the deletion, which cannot be undone
+            instrument_ids = instrument_ids.result()
+            if strategy_key is not None:
+                strategy_key.result()
+            deleted_previous_trades = None
+            if delete_previous_trades and trading_type in [TradingType.BACKTESTING, TradingType.PAPERTRADING]:
+                deleted_previous_trades = _submit_step('delete_previous_trades', self.delete_previous_trades, strategy_code)
+
+            # Setup config for starting the job
+            strategy_config = {
+                'instruments': {
+                    'instruments': [{'id': _id} for _id in instrument_ids]
+                },
+                'lots': lots,
+                'userParams': restructured_strategy_parameters,
+                'candleDuration': candle_interval.value,
+                'strategyMode': strategy_mode.value
+            }
+            _run_step('set_strategy_config', self.api.set_strategy_config, strategy_code=strategy_code, strategy_config=strategy_config, trading_type=trading_type)
+
+            # Submit trading job
+            if deleted_previous_trades is not None:
+                deleted_previous_trades.result()
+            response = _run_step('start_strategy_algotrading', self.api.start_strategy_algotrading, strategy_code=strategy_code, start_timestamp=start_timestamp, end_timestamp=end_timestamp, trading_type=trading_type,
+                                 lots=lots, initial_funds_virtual=initial_funds_virtual, broker_details=broking_details, location=location)
+
+        self.start_job_timings = OrderedDict(sorted(start_job_timings.items(), key=lambda _: _[1]['start']))
+        self.start_job_timings['total'] = {'start': 0.0, 'duration': time.monotonic() - started_at}
+        if pipelined:
+            print(tabulate([[step, f"{_['start']:.3f}", f"{_['duration']:.3f}"] for step, _ in self.start_job_timings.items()], headers=['Step', 'Start (s)', 'Duration (s)'], tablefmt='psql'))
 
         self.strategy_country_map[trading_type][strategy_code] = Country[Locale(location).name].value
         return response
 
+    def get_job_queue(self, max_concurrency=1, poll_interval=10, results_dir=None, collect_order_history=True):
+        """
+        Create a queue for running many jobs unattended, say hundreds of backtests overnight
+
+        Args:
+            max_concurrency: maximum number of jobs running at once; should not be more than the job slots of the account
+            poll_interval: seconds between two rounds of job status polls
+            results_dir: directory to save the P&L table, order history and summary of every job in; None keeps them in memory only
+            collect_order_history: if True, the order history of every job is collected along with its P&L table
+
+        Returns:
+            JobQueue object; add job specs with `add()`, then call `run()`
+        """
+
+        return JobQueue(self, max_concurrency=max_concurrency, poll_interval=poll_interval, results_dir=results_dir, collect_order_history=collect_order_history)
+
+    def clone_strategy(self, strategy, count, strategy_name=None):
+        """
+        Upload copies of a strategy under derived names ('<name> (clone 1)', '<name> (clone 2)', ...), so that they can run jobs at the same time.
+        Clones uploaded earlier are reused; a clone is uploaded again only if its source code differs from that of the strategy.
+
+        Args:
+            strategy: strategy class, a subclass of StrategyBase
+            count: number of clones
+            strategy_name: base name of the clones; defaults to the name of the strategy
+
+        Returns:
+            list of strategy codes of the clones
+
+        Raises:
+            ValueError: if a clone could not be uploaded
+        """
+
+        assert issubclass(strategy, StrategyBase), f'strategy should be a subclass of class StrategyBase. Got class of type: type{strategy}'
+        assert isinstance(count, int) and count > 0, f'Argument "count" should be a positive integer'
+
+        strategy_name = strategy_name or (strategy.name if isinstance(strategy.name, str) else strategy.name())
+        strategy_details = inspect.getsource(strategy)
+        by_name = self.get_strategy_catalogue(force_fetch=True)['by_name']
+
+        strategy_codes = []
+        for i in range(count):
+            clone_name = f'{strategy_name} (clone {i + 1})'
+            clone = by_name.get(clone_name)
+            if clone is None:
+                response = self.create_strategy(strategy, strategy_name=clone_name)
+                if not response or 'strategyId' not in response:
+                    # the platform has no API to delete a strategy; the clones uploaded so far are reused by the next call
+                    raise ValueError(f'ERROR: Could not upload clone "{clone_name}" of strategy "{strategy_name}" (say, for insufficient balance or a forbidden operation). '
+                                     f'Clones uploaded so far: {strategy_codes}')
+                strategy_codes.append(response['strategyId'])
+            else:
+                if self.get_strategy_details(clone['strategyCode']) != strategy_details:
+                    self.create_strategy(strategy, overwrite=True, strategy_code=clone['strategyCode'], strategy_name=clone_name)
+                strategy_codes.append(clone['strategyCode'])
+
+        return strategy_codes
+
+    def sweep(self, strategy, parameters, start=None, end=None, instruments=None, lots=None, candle=None, mode=None, initial_funds_virtual=None, max_concurrency=2, poll_interval=10, results_dir=None,
+              broker_commission_percentage=None, broker_commission_price=None):
+        """
+        Backtest a strategy over a grid of parameters, running the grid points at the same time on clones of the strategy (see `clone_strategy()`)
+
+        Args:
+            strategy: strategy class, a subclass of StrategyBase
+            parameters: dict of parameter name to list of values (every combination is backtested), or a list of parameter dicts
+            start: Start date-time
+            end: End date-time
+            instruments: Instrument key
+            lots: Number of lots of the passed instrument to trade on
+            candle: Candle interval
+            mode: Intraday or delivery
+            initial_funds_virtual: virtual funds allotted before the backtesting starts
+            max_concurrency: number of clones, i.e. the maximum number of backtests running at once; should not be more than the job slots of the account
+            poll_interval: seconds between two rounds of job status polls
+            results_dir: directory to save the results of every backtest in; a sweep using the same directory skips the grid points already backtested
+            broker_commission_percentage: Percentage of broker commission per trade
+            broker_commission_price: Broker fee per trade
+
+        Returns:
+            DataFrame with one row per grid point: the parameters, the job and the P&L metrics (trades, net_pnl, win_rate, avg_pnl, max_drawdown, profit_factor), sorted by net P&L
+        """
+
+        grid = get_parameter_grid(parameters)
+        assert len(grid) > 0, f'Argument "parameters" should have at least one grid point'
+
+        strategy_name = strategy.name if isinstance(strategy.name, str) else strategy.name()
+        strategy_codes = self.clone_strategy(strategy, min(max_concurrency, len(grid)))
+
+        queue = self.get_job_queue(max_concurrency=max_concurrency, poll_interval=poll_interval, results_dir=results_dir, collect_order_history=False)
+        job_kwargs = dict(start_timestamp=start, end_timestamp=end, instruments=instruments, lots=lots, candle_interval=candle, strategy_mode=mode, initial_funds_virtual=initial_funds_virtual)
+        names = []
+        for i, point in enumerate(grid):
+            # the name identifies the grid point and the backtest config, so that results saved by an earlier sweep are reused only for the same backtest
+            name = f"{strategy_name}-{hashlib.sha256(json.dumps([point, job_kwargs], sort_keys=True, default=str).encode()).hexdigest()[:12]}"
+            names.append(queue.add(strategy_codes[i % len(strategy_codes)], TradingType.BACKTESTING, name=name, strategy_parameters=point, **job_kwargs))
+        queue.run()
+
+        rows = []
+        for point, name in zip(grid, names):
+            record = queue.results.get(name) or {}
+            pnl_df = queue.results.get_pnl(name)
+            if pnl_df is not None and not pnl_df.empty and (broker_commission_percentage is not None or broker_commission_price is not None):
+                pnl_df = calculate_brokerage(pnl_df=pnl_df, brokerage_percentage=broker_commission_percentage, brokerage_flat_price=broker_commission_price)
+            metrics = get_pnl_metrics(pnl_df)
+            # no metrics for the jobs which failed or whose results could not be collected, rather than the zeros of an empty P&L table
+            if record.get('status') != 'completed' or pnl_df is None:
+                metrics = dict.fromkeys(metrics)
+            rows.append(dict(point, job=name, strategy_code=record.get('strategy_code'), status=record.get('status'), **metrics))
+
+        return pd.DataFrame(rows).sort_values('net_pnl', ascending=False, ignore_index=True)
+
     def backtest(self, strategy=None, start=None, end=None, instruments=None, lots=None, parameters=None, candle=None, mode=None, delete_previous_trades=True, initial_funds_virtual=None, vendor_details=None, **kwargs):
         """
         Submit a backtesting job for a strategy on the AlgoBulls Platform
@@ -886,6 +1232,8 @@ class AlgoBullsConnection:
         # Update previously saved pnl data and exchange location
         self.backtesting_pnl_data = None
 
+        return _
+
     def get_backtesting_job_status(self, strategy_code):
         """
         Get Back Testing job status for given strategy_code
@@ -1036,6 +1384,8 @@ class AlgoBullsConnection:
         # Update previously saved pnl data and exchange location
         self.papertrade_pnl_data = None
 
+        return _
+
     def get_papertrading_job_status(self, strategy_code):
         """
         Get Paper Trading job status
@@ -1186,8 +1536,10 @@ class AlgoBullsConnection:
         # Update previously saved pnl data and exchange location
         self.realtrade_pnl_data = None
 
+        return _
+
     def livetrade(self, *args, **kwargs):
-        self.realtrade(*args, **kwargs)
+        return self.realtrade(*args, **kwargs)
 
     def get_realtrading_job_status(self, strategy_code):
         """
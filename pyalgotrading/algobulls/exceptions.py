@@ -3,10 +3,12 @@ class AlgoBullsAPIBaseException(Exception):
     Base exception class for all API related exceptions
     """
 
-    def __init__(self, method, url, response, status_code):
+    def __init__(self, method, url, response, status_code, retry_after=None):
         self.method = method
         self.url = url
         self.response = response
+        self.status_code = status_code
+        self.retry_after = retry_after  # value of the Retry-After header, if sent by the platform
 
         message = f'{self.get_error_type()} | Method: {self.method} | URL: {self.url} | Response: {self.response} | status code: {status_code}'
 
@@ -0,0 +1,352 @@
+"""
+Module for running many BT/PT/RT jobs on the [AlgoBulls](https://www.algobulls.com) platform unattended, and collecting their results.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime as dt
+
+import pandas as pd
+
+from .exceptions import AlgoBullsAPIForbiddenErrorException
+from .monitor import SUBMITTED_GRACE_SECONDS
+from .retry import RetryPolicy
+from ..constants import ExecutionStatus, TradingType
+
+
+class JobResultStore:
+    """
+    Store of the results of the jobs run by a `JobQueue`: a summary record, the P&L table and the order history of every job.
+
+    With a directory, the records are appended to `index.jsonl` and the tables are saved as `<name>/pnl.csv` and `<name>/order_history.csv`, hence the results survive the process,
+    and a queue using the same directory skips the jobs already completed.
+
+    The status of a record is 'completed' once the results of the job are collected, 'collect_failed' if the job ran but its results could not be collected (it is run again by a later queue),
+    or 'failed' if the job could not be submitted.
+    """
+
+    def __init__(self, directory: str = None):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            directory: directory to save the results in; None keeps them in memory only
+        """
+
+        self.directory = directory
+        self.records = OrderedDict()  # name to record
+        self._tables = {}  # (name, table) to DataFrame, for the results kept in memory
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            index_path = os.path.join(directory, 'index.jsonl')
+            if os.path.exists(index_path):
+                with open(index_path) as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:  # torn write of an interrupted run
+                            continue
+                        self.records[record['name']] = record
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, name):
+        return name in self.records
+
+    def add(self, record: dict, pnl: pd.DataFrame = None, order_history: pd.DataFrame = None):
+        """
+        Save the results of a job; a later record of the same name replaces the earlier one
+
+        Args:
+            record: summary of the job; should have a 'name' key
+            pnl: P&L table of the job
+            order_history: order history of the job
+        """
+
+        name = record['name']
+        self.records[name] = record
+        for table, df in [('pnl', pnl), ('order_history', order_history)]:
+            if df is None:
+                continue
+            if self.directory is None:
+                self._tables[(name, table)] = df
+            else:
+                os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+                df.to_csv(os.path.join(self.directory, name, f'{table}.csv'))
+
+        if self.directory is not None:
+            with open(os.path.join(self.directory, 'index.jsonl'), 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+
+    def get(self, name: str) -> dict:
+        """
+        Fetch the summary record of a job
+
+        Args:
+            name: name of the job
+
+        Returns:
+            record, or None if the job has no results
+        """
+
+        return self.records.get(name)
+
+    def _get_table(self, name, table):
+        if self.directory is None:
+            return self._tables.get((name, table))
+        path = os.path.join(self.directory, name, f'{table}.csv')
+        return pd.read_csv(path, index_col=0) if os.path.exists(path) else None
+
+    def get_pnl(self, name: str) -> pd.DataFrame:
+        """
+        Fetch the P&L table of a job
+
+        Args:
+            name: name of the job
+
+        Returns:
+            DataFrame, or None if not available
+        """
+
+        return self._get_table(name, 'pnl')
+
+    def get_order_history(self, name: str) -> pd.DataFrame:
+        """
+        Fetch the order history of a job
+
+        Args:
+            name: name of the job
+
+        Returns:
+            DataFrame, or None if not available
+        """
+
+        return self._get_table(name, 'order_history')
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Fetch the summary records of all the jobs
+
+        Returns:
+            DataFrame with one row per job
+        """
+
+        return pd.DataFrame(list(self.records.values()))
+
+
+class QueuedJob:
+    """
+    A job spec waiting in, or run by, a `JobQueue`
+    """
+
+    def __init__(self, name: str, strategy_code: str, trading_type: TradingType, start_job_kwargs: dict):
+        self.name = name
+        self.strategy_code = strategy_code
+        self.trading_type = trading_type
+        self.start_job_kwargs = start_job_kwargs
+        self.status = None
+        self.seen_running = False  # True once the job is seen STARTING or STARTED
+        self.submit_attempts = 0
+        self.submitted_at = None
+        self.completed_at = None
+        self.response = None
+        self.error = None  # exception of the last refused submission, if any
+
+    @property
+    def key(self) -> tuple:
+        return self.strategy_code, self.trading_type
+
+
+class JobQueue:
+    """
+    Queue of job specs, run with a limit on the number of jobs running at once.
+
+    Jobs are submitted one at a time from the thread calling `run()`, since `AlgoBullsConnection.start_job()` shares `saved_parameters` between calls; arguments missing from a spec fall back
+    to those of the previous job, same as for `start_job()`. The platform runs one job per strategy and trading type, so specs of the same strategy and trading type run one after the other.
+    Submissions refused with a 403 (say, no free job slot on the platform) or a 5xx are retried once a running job completes, or after a back-off if none is running.
+    Once a job is STOPPED, its P&L table and order history are collected into `results`.
+    """
+
+    def __init__(self, connection, max_concurrency: int = 1, poll_interval: float = 10, results_dir: str = None, collect_order_history: bool = True, max_submit_attempts: int = 10):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            connection: AlgoBullsConnection object
+            max_concurrency: maximum number of jobs running at once; should not be more than the job slots of the account
+            poll_interval: seconds between two rounds of job status polls
+            results_dir: directory to save the results in (see `JobResultStore`); None keeps them in memory only
+            collect_order_history: if True, the order history of every job is collected along with its P&L table
+            max_submit_attempts: number of refused submissions, while no job of the queue is running, after which a job is given up
+        """
+
+        assert isinstance(max_concurrency, int) and max_concurrency > 0, f'Argument "max_concurrency" should be a positive integer'
+        assert poll_interval > 0, f'Argument "poll_interval" should be a positive number'
+
+        self.connection = connection
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.collect_order_history = collect_order_history
+        self.max_submit_attempts = max_submit_attempts
+        self.retry_policy = RetryPolicy(base_delay=poll_interval, max_delay=10 * poll_interval)
+        connection.api.track_retries(self.retry_policy)
+        self.results = JobResultStore(results_dir)
+        self.pending = []
+        self.running = []
+        self._names = set()
+
+    def __len__(self):
+        return len(self.pending) + len(self.running)
+
+    def add(self, strategy_code: str, trading_type: TradingType = TradingType.BACKTESTING, name: str = None, **start_job_kwargs) -> str:
+        """
+        Add a job spec to the queue
+
+        Args:
+            strategy_code: strategy code
+            trading_type: trading type
+            name: unique name of the job, under which its results are saved; defaults to '<strategy code>-<trading type>-<index>'
+            start_job_kwargs: other arguments of `AlgoBullsConnection.start_job()`, say start_timestamp, end_timestamp, instruments, lots, strategy_parameters and candle_interval
+
+        Returns:
+            name of the job
+        """
+
+        assert isinstance(strategy_code, str), f'Argument "strategy_code" should be a string'
+        assert isinstance(trading_type, TradingType), f'Argument "trading_type" should be an enum of type {TradingType.__name__}'
+
+        name = name or f'{strategy_code}-{trading_type.name}-{len(self._names)}'
+        assert name not in self._names, f'A job named "{name}" is already in the queue'
+        self._names.add(name)
+
+        record = self.results.get(name)
+        if record is not None and record['status'] == 'completed':
+            print(f'Skipping job "{name}", its results are already available.')
+            return name
+
+        self.pending.append(QueuedJob(name=name, strategy_code=strategy_code, trading_type=trading_type, start_job_kwargs=start_job_kwargs))
+        return name
+
+    def _save(self, job, status, error=None, pnl=None, order_history=None):
+        if pnl is not None and not pnl.empty:
+            net_pnl, trades = float(pnl['net_pnl'].sum()), len(pnl)
+        elif pnl is not None:
+            net_pnl, trades = 0.0, 0
+        else:
+            net_pnl, trades = None, None  # not collected, which is not the same as no trades
+        self.results.add({
+            'name': job.name,
+            'strategy_code': job.strategy_code,
+            'trading_type': job.trading_type.name,
+            'status': status,
+            'error': str(error) if error is not None else None,
+            'submitted_at': dt.fromtimestamp(job.submitted_at).isoformat() if job.submitted_at else None,
+            'completed_at': dt.fromtimestamp(job.completed_at).isoformat() if job.completed_at else None,
+            'duration': job.completed_at - job.submitted_at if job.submitted_at and job.completed_at else None,
+            'trades': trades,
+            'orders': len(order_history) if order_history is not None else None,
+            'net_pnl': net_pnl,
+            'parameters': job.start_job_kwargs.get('strategy_parameters'),
+        }, pnl=pnl, order_history=order_history)
+
+    def _submit(self, job) -> bool:
+        # Returns False if the submission was refused and should be retried later. Refusals while jobs of the queue are running are expected (no free slot), hence not counted
+        if not self.running:
+            job.submit_attempts += 1
+        error = None
+        try:
+            # the API prints and swallows a 403 (Forbidden) or 402 (Insufficient Balance) on submission, returning None
+            job.response = self.connection.start_job(strategy_code=job.strategy_code, trading_type=job.trading_type, **job.start_job_kwargs)
+            retryable = job.response is None
+        except Exception as ex:
+            error = ex
+            retryable = isinstance(ex, AlgoBullsAPIForbiddenErrorException) or self.retry_policy.is_retryable(ex)
+            if not retryable:
+                print(f'Giving up job "{job.name}".\n{ex}')
+                self._save(job, 'failed', error=ex)
+                return True
+
+        if retryable:
+            job.error = error
+            if job.submit_attempts < self.max_submit_attempts:
+                print(f'Could not submit job "{job.name}", will retry.')
+                return False
+            print(f'Giving up job "{job.name}" after {job.submit_attempts} refused submissions.')
+            self._save(job, 'failed', error=error or 'Submission refused')
+            return True
+
+        job.submitted_at = time.time()
+        self.running.append(job)
+        return True
+
+    def _collect(self, job):
+        job.completed_at = time.time()
+        pnl = order_history = error = None
+        try:
+            pnl = self.connection.get_report_pnl_table(job.strategy_code, job.trading_type, None)
+            if self.collect_order_history:
+                order_history = self.connection.get_report_order_history(job.strategy_code, job.trading_type, render_as_dataframe=True)
+        except Exception as ex:
+            error = ex
+            print(f'Could not collect the results of job "{job.name}".\n{ex}')
+        # a job whose results could not be collected is not 'completed', so that a later queue using the same directory runs it again
+        self._save(job, 'completed' if error is None else 'collect_failed', error=error, pnl=pnl, order_history=order_history)
+
+    def _poll(self, job) -> bool:
+        # Returns True once the job is done
+        status = self.connection.api.retry_policy.call(self.connection.api.get_job_status, strategy_code=job.strategy_code, trading_type=job.trading_type)['message']
+        job.status = status
+        if status in [ExecutionStatus.STARTING.value, ExecutionStatus.STARTED.value]:
+            job.seen_running = True
+        if status != ExecutionStatus.STOPPED.value:
+            return False
+        # until the job is seen running, a STOPPED status may be that of the previous job of the same strategy; a job which completes between two polls is never seen running,
+        # hence it is taken as completed once the grace period after its submission is over
+        return job.seen_running or time.time() - job.submitted_at >= SUBMITTED_GRACE_SECONDS
+
+    def run(self):
+        """
+        Run all the jobs in the queue, blocking until every one of them is completed or given up. Results are available in `results`.
+
+        Returns:
+            DataFrame with the summary records of all the jobs, see `JobResultStore.to_dataframe()`
+        """
+
+        total = len(self)
+        retry_at, retries = 0, 0
+        while self.pending or self.running:
+            # submit as many jobs as there are free slots, skipping the specs whose strategy & trading type is already running
+            while self.pending and len(self.running) < self.max_concurrency and time.monotonic() >= retry_at:
+                running_keys = {_.key for _ in self.running}
+                job = next((_ for _ in self.pending if _.key not in running_keys), None)
+                if job is None:
+                    break
+                if not self._submit(job):
+                    retries += 1
+                    delay = self.retry_policy.get_delay(retries)
+                    self.retry_policy.notify_retry(retries, job.error, delay)
+                    # with jobs running, the platform slots are likely full; wait for one of them to complete
+                    retry_at = time.monotonic() + delay if not self.running else float('inf')
+                    break
+                self.pending.remove(job)
+                retries = 0
+                print(f'[{total - len(self)}/{total} done] Submitted job "{job.name}".')
+
+            time.sleep(self.poll_interval)
+
+            for job in list(self.running):
+                try:
+                    done = self._poll(job)
+                except Exception as ex:
+                    print(f'Could not fetch the status of job "{job.name}", will retry.\n{ex}')
+                    continue
+                if done:
+                    self.running.remove(job)
+                    self._collect(job)
+                    print(f'[{total - len(self)}/{total} done] Completed job "{job.name}"{"" if self.results.get(job.name)["status"] == "completed" else ", without its results"}.')
+                    retry_at = 0  # a slot was freed
+
+        return self.results.to_dataframe()
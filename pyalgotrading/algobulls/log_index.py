@@ -0,0 +1,231 @@
+"""
+Module for an inverted index over strategy execution logs, built incrementally as the logs are spooled (see `LogSpool`).
+
+The index maps tokens to the numbers of the lines holding them:
+    * 'order:<order id>'
+    * 'symbol:<TRADINGSYMBOL>' (say, 'symbol:SBIN' for NSE_EQ:SBIN)
+    * 'level:<LEVEL>' (lines without a log record, say those of a traceback, take the level of the preceding record)
+and every minute ('YYYY-MM-DD HH:MM') to the range of lines logged in it, stored as the lines at which the minute changes. Line numbers are stored as runs of consecutive lines, which keeps tokens present on most lines (say, 'level:INFO') small.
+
+On disk, the index is a `tokens.jsonl` file in the spool directory, with one batch per gzip member of the spool.
+"""
+import bisect
+import itertools
+import json
+import os
+import re
+from datetime import datetime as dt, time as dt_time
+
+from .log_parser import ORDER_ID_PATTERN
+
+TOKENS_FILE_NAME = 'tokens.jsonl'
+
+# Head of a log record: the minute of its timestamp, and its level. Matched over a whole batch of lines at once, which is much faster than matching line by line
+LOG_RECORD_HEAD_PATTERN = re.compile(r'^\[(?:BT|PT|RT)\] \[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}):\d{2},\d{3}\] \[([A-Z]+)\]', re.MULTILINE)
+
+# "<EXCHANGE>[_<SEGMENT>]:<TRADINGSYMBOL>", say NSE_EQ:SBIN or NFO:NIFTY23AUG19500CE
+INSTRUMENT_PATTERN = re.compile(r'\b(?:NSE|BSE|NFO|BFO|MCX|CDS|NASDAQ|NYSE)(?:_[A-Z]+)?:([A-Z0-9][A-Z0-9&_-]*(?:\.[A-Z0-9]+)?)')
+
+
+def _add_line(runs, line):
+    # append a line number to a list of [start, end) runs, extending the last run if consecutive; a repeated line number is ignored
+    if runs and runs[-1][1] >= line:
+        runs[-1][1] = max(runs[-1][1], line + 1)
+    else:
+        runs.append([line, line + 1])
+
+
+def build_log_index_batch(lines: list, first_line: int, level: str = None, minute: str = None) -> dict:
+    """
+    Index a batch of log lines
+
+    Args:
+        lines: log lines, one per element (as split by `str.splitlines()`)
+        first_line: number of the first line in the log
+        level: level of the last record before this batch, for its continuation lines
+        minute: minute of the last record before this batch, for its continuation lines
+
+    Returns:
+        dict with 'first_line', 'lines', 'tokens' (token to runs of line numbers), 'minutes' (list of [minute, number of the line it starts at], for every change of minute),
+        and the 'level' & 'minute' of the last record, to be passed on to the next batch
+    """
+
+    text = ''.join(lines)
+    line_starts = list(itertools.accumulate(map(len, lines)))[:-1]
+    tokens, minutes = {}, []
+
+    def _get_line(position):
+        return first_line + bisect.bisect_right(line_starts, position)
+
+    # levels & minutes, from the record heads; lines up to the next record head take the level & minute of the record
+    level_start = first_line
+    for match in LOG_RECORD_HEAD_PATTERN.finditer(text):
+        _minute, _level = match.groups()
+        line = _get_line(match.start())
+        if _level != level:
+            if level is not None and line > level_start:
+                _add_line(tokens.setdefault(f'level:{level}', []), level_start)
+                tokens[f'level:{level}'][-1][1] = line
+            level, level_start = _level, line
+        if _minute != minute:
+            minutes.append([_minute, line])
+            minute = _minute
+    if level is not None and first_line + len(lines) > level_start:
+        _add_line(tokens.setdefault(f'level:{level}', []), level_start)
+        tokens[f'level:{level}'][-1][1] = first_line + len(lines)
+
+    for pattern, prefix in [(ORDER_ID_PATTERN, 'order:'), (INSTRUMENT_PATTERN, 'symbol:')]:
+        for match in pattern.finditer(text):
+            _add_line(tokens.setdefault(prefix + match.group(1), []), _get_line(match.start()))
+
+    return {'first_line': first_line, 'lines': len(lines), 'tokens': tokens, 'minutes': minutes, 'level': level, 'minute': minute}
+
+
+def _to_minute(value):
+    # a datetime, a 'YYYY-MM-DD HH:MM[:SS]' string, a time or an 'HH:MM' string, to a minute string; times match the minutes of any date
+    if value is None:
+        return None
+    if isinstance(value, dt):
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, dt_time):
+        return value.strftime('%H:%M')
+    value = value.strip()
+    return value[:5] if len(value) <= 8 else value[:16]
+
+
+class LogIndex:
+    """
+    Reader of the inverted index of a spool. The index is loaded incrementally: a refresh reads only the batches added since the last one.
+    """
+
+    def __init__(self, path: str):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            path: spool directory
+        """
+
+        self.path = path
+        self.tokens = {}  # token to runs of line numbers
+        self.minute_keys = []  # minutes at which the logged minute changes, in log order
+        self.minute_lines = []  # number of the line at which each of those minutes starts
+        self.line_count = 0
+        self._offset = 0
+
+    def refresh(self, line_count: int = None):
+        """
+        Load the batches added to the index since the last refresh
+
+        Args:
+            line_count: number of lines in the spool; batches beyond it (written by a process which crashed before indexing the member) are ignored
+        """
+
+        path = os.path.join(self.path, TOKENS_FILE_NAME)
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                batch = json.loads(line)
+                if line_count is not None and batch['first_line'] + batch['lines'] > line_count:
+                    break
+                self._offset += len(line.encode())
+                if batch['first_line'] < self.line_count:  # already loaded
+                    continue
+                for token, runs in batch['tokens'].items():
+                    _runs = self.tokens.setdefault(token, [])
+                    if _runs and runs and _runs[-1][1] == runs[0][0]:
+                        _runs[-1][1] = runs[0][1]
+                        runs = runs[1:]
+                    _runs.extend(runs)
+                for minute, line in batch['minutes']:
+                    self.minute_keys.append(minute)
+                    self.minute_lines.append(line)
+                self.line_count = batch['first_line'] + batch['lines']
+
+    def _get_minute_runs(self, start, end):
+        # runs of the lines logged from minute `start` to minute `end` (included), found by bisection since the log is in time order
+        keys, lines = self.minute_keys, self.minute_lines
+        if not keys:
+            return []
+
+        def _run(_start, _end):
+            i = bisect.bisect_left(keys, _start) if _start is not None else 0
+            j = bisect.bisect_right(keys, _end) if _end is not None else len(keys)
+            return [lines[i], lines[j] if j < len(lines) else self.line_count] if i < j else None
+
+        if (start is None or len(start) > 5) and (end is None or len(end) > 5):
+            runs = [_run(start, end)]
+        else:
+            # times of the day: one range per date in the log
+            runs, i = [], 0
+            while i < len(keys):
+                date = keys[i][:10]
+                runs.append(_run(f'{date} {start}' if start is not None else date, f'{date} {end}' if end is not None else f'{date} ~'))
+                i = bisect.bisect_left(keys, f'{date} ~')  # '~' sorts after all the digits, hence this is the first minute of the next date
+        return [_ for _ in runs if _ is not None]
+
+    def get_tokens(self, prefix: str = '') -> list:
+        """
+        Fetch the tokens in the index
+
+        Args:
+            prefix: if given, only the tokens starting with it, say 'order:' or 'symbol:'
+
+        Returns:
+            sorted list of tokens
+        """
+
+        return sorted(_ for _ in self.tokens if _.startswith(prefix))
+
+    def lookup(self, order_id: str = None, symbol: str = None, level: str = None, start=None, end=None) -> list:
+        """
+        Fetch the numbers of the lines matching all the given criteria
+
+        Args:
+            order_id: order id
+            symbol: tradingsymbol, say 'SBIN'; an '<EXCHANGE>:<TRADINGSYMBOL>' string works too
+            level: level, say 'ERROR'
+            start: first minute, as a datetime or a 'YYYY-MM-DD HH:MM' string; a time or an 'HH:MM' string matches that time on any date
+            end: last minute (included), in the same formats as `start`; if both are given, both are dates & times or both are times of the day
+
+        Returns:
+            sorted list of line numbers
+
+        Raises:
+            ValueError: if one of `start` and `end` is a date & time and the other a time of the day
+        """
+
+        runs = None
+        for token in [f'order:{order_id}' if order_id else None, f'symbol:{symbol.split(":")[-1].upper()}' if symbol else None, f'level:{level.upper()}' if level else None]:
+            if token is not None:
+                runs = self.tokens.get(token, []) if runs is None else _intersect(runs, self.tokens.get(token, []))
+
+        start, end = _to_minute(start), _to_minute(end)
+        if start is not None and end is not None and (len(start) > 5) != (len(end) > 5):
+            # a time of the day bounds the minutes of every date, a date & time a single range; the two do not make one range
+            raise ValueError(f'ERROR: Arguments "start" ({start}) and "end" ({end}) should both be dates & times, or both be times of the day')
+        if start is not None or end is not None:
+            minute_runs = self._get_minute_runs(start, end)
+            runs = minute_runs if runs is None else _intersect(runs, minute_runs)
+
+        if runs is None:
+            return []
+        return [line for first, last in runs for line in range(first, last)]
+
+
+def _intersect(runs_a, runs_b):
+    # intersection of two sorted lists of [start, end) runs
+    result, i, j = [], 0, 0
+    while i < len(runs_a) and j < len(runs_b):
+        start, end = max(runs_a[i][0], runs_b[j][0]), min(runs_a[i][1], runs_b[j][1])
+        if start < end:
+            result.append([start, end])
+        if runs_a[i][1] < runs_b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
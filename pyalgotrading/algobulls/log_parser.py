@@ -0,0 +1,135 @@
+"""
+Module for parsing strategy execution logs into structured, columnar records.
+
+Log lines look like:
+    [BT] [2021-08-13 09:15:00,000] [INFO] [order] [NEW ORDER SUCCESS] [2021-08-13 09:15:00+05:30] [8e42ef93b9184169a91f17dc7d5e6bee] [BUY] [NSE_EQ:HINDALCO] ...
+i.e. the mode tag, the timestamp, the level and the module, followed by the message.
+"""
+import re
+from datetime import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+# Precompiled once; a single match per line extracts all the fields
+LOG_LINE_PATTERN = re.compile(r'^\[(BT|PT|RT)\] \[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})\] \[([A-Z]+)\] (?:\[([\w.]+)\] )?(.*)', re.DOTALL)
+LOG_TIMESTAMP_PATTERN = re.compile(r'^\[(?:BT|PT|RT)\] \[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})\]')
+ORDER_ID_PATTERN = re.compile(r'\[([0-9a-f]{32})\]')
+
+LOG_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S,%f'
+LOG_COLUMNS = ['line', 'mode', 'timestamp', 'level', 'module', 'message', 'order_id']
+
+
+def get_log_timestamp(line: str) -> str:
+    """
+    Fetch the timestamp of a log line
+
+    Args:
+        line: log line
+
+    Returns:
+        timestamp as a string (say '2021-08-13 09:15:00,000'), or None if the line has no timestamp (say, a line of a traceback)
+    """
+
+    match = LOG_TIMESTAMP_PATTERN.match(line)
+    return match.group(1) if match else None
+
+
+def get_last_log_timestamp(lines: list) -> dt:
+    """
+    Fetch the timestamp of the last log line having one
+
+    Args:
+        lines: log lines
+
+    Returns:
+        timestamp as a naive datetime, or None if no line has a timestamp
+    """
+
+    for line in reversed(lines):
+        timestamp = get_log_timestamp(line)
+        if timestamp is not None:
+            return dt.strptime(timestamp, LOG_TIMESTAMP_FORMAT)
+    return None
+
+
+def parse_log_line(line: str) -> dict:
+    """
+    Parse a log line
+
+    Args:
+        line: log line
+
+    Returns:
+        dict with the keys 'mode', 'timestamp' (string), 'level', 'module', 'message' and 'order_id' (None if the line has no order id), or None if the line is not a log record (say, a line of a traceback)
+    """
+
+    match = LOG_LINE_PATTERN.match(line)
+    if match is None:
+        return None
+    mode, timestamp, level, module, message = match.groups()
+    order_id = ORDER_ID_PATTERN.search(message)
+    return {'mode': mode, 'timestamp': timestamp, 'level': level, 'module': module, 'message': message.rstrip('\n'), 'order_id': order_id.group(1) if order_id else None}
+
+
+class LogTable:
+    """
+    Columnar table of parsed log records, built incrementally from pages of log lines.
+
+    Lines which are not log records (say, the lines of a traceback) are appended to the message of the preceding record.
+    """
+
+    def __init__(self):
+        """
+        Init method that is used while creating an object of this class
+        """
+
+        self.columns = {_: [] for _ in LOG_COLUMNS}
+        self.line_count = 0
+
+    def __len__(self):
+        return len(self.columns['line'])
+
+    def extend(self, lines: list):
+        """
+        Parse and append log lines
+
+        Args:
+            lines: list of log lines, say a page yielded by `AlgoBullsConnection.iter_logs()`
+        """
+
+        _line, _mode, _timestamp, _level, _module, _message, _order_id = (self.columns[_] for _ in LOG_COLUMNS)
+        match_line, search_order_id = LOG_LINE_PATTERN.match, ORDER_ID_PATTERN.search
+
+        for line in lines:
+            match = match_line(line)
+            if match is None:
+                if _message:
+                    _message[-1] += '\n' + line.rstrip('\n')
+            else:
+                mode, timestamp, level, module, message = match.groups()
+                order_id = search_order_id(message)
+                _line.append(self.line_count)
+                _mode.append(mode)
+                _timestamp.append(timestamp)
+                _level.append(level)
+                _module.append(module)
+                _message.append(message.rstrip('\n'))
+                _order_id.append(order_id.group(1) if order_id else None)
+            self.line_count += 1
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Fetch the records as a DataFrame
+
+        Returns:
+            DataFrame with the columns 'line' (number of the line in the logs, starting from 0), 'mode', 'timestamp' (datetime64), 'level', 'module', 'message' and 'order_id'.
+            The low-cardinality columns are categorical, which keeps filtering and grouping fast on millions of rows
+        """
+
+        df = pd.DataFrame(self.columns, columns=LOG_COLUMNS)
+        # numpy parses ISO 8601 timestamps in C, which is an order of magnitude faster than strptime on distinct values
+        df['timestamp'] = np.array([_.replace(',', '.') for _ in self.columns['timestamp']], dtype='datetime64[ms]')
+        for column in ['mode', 'level', 'module']:
+            df[column] = df[column].astype('category')
+        return df
@@ -0,0 +1,420 @@
+"""
+Module for spooling strategy execution logs to disk, for long Paper Trading / Real Trading sessions whose logs should not be kept in memory.
+
+A spool is a directory per (strategy, trading type, run) holding:
+    * segment files `segment_<n>.log.gz`, each made of gzip members appended one after the other (so every segment is a valid gzip file)
+    * an `index.jsonl` file, with one line per gzip member recording where it starts, how many log lines it holds, the timestamps of its first and last log lines,
+      and the `nextForwardToken` of the logs following it (the checkpoint to resume fetching from)
+    * a `tokens.jsonl` file, with one batch of the inverted index (see `log_index`) per gzip member
+
+The index lets a reader tail the spool, seek to a timestamp, or search by order id, tradingsymbol, level and time, by decompressing only the members it needs.
+"""
+import bisect
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime as dt
+
+from .log_index import TOKENS_FILE_NAME, LogIndex, build_log_index_batch
+from .log_parser import LOG_TIMESTAMP_FORMAT, get_log_timestamp
+from ..constants import TradingType
+
+SEGMENT_FILE_NAME = 'segment_{:05d}.log.gz'
+INDEX_FILE_NAME = 'index.jsonl'
+
+
+def get_spool_path(directory: str, strategy_code: str, trading_type: TradingType, run_id: str) -> str:
+    """
+    Fetch the path of the spool of a run
+
+    Args:
+        directory: root directory of all the spools
+        strategy_code: strategy code
+        trading_type: trading type
+        run_id: id of the run
+
+    Returns:
+        path of the spool directory
+    """
+
+    return os.path.join(directory, strategy_code, trading_type.name, run_id)
+
+
+def _read_index(path):
+    # Returns the index entries, and whether the index file ends with a partially written line (left behind by a crash)
+    index, partial = [], False
+    try:
+        with open(os.path.join(path, INDEX_FILE_NAME)) as f:
+            for line in f:
+                try:
+                    if not line.endswith('\n'):
+                        raise ValueError
+                    index.append(json.loads(line))
+                except ValueError:
+                    partial = True
+                    break
+    except FileNotFoundError:
+        pass
+    return index, partial
+
+
+class LogSpool:
+    """
+    Append-only, compressed, rotating log sink.
+
+    Lines are buffered in memory until `buffer_size` bytes are pending (or `flush()` is called), and are then written out as one gzip member.
+    """
+
+    FSYNC_ALWAYS = 'always'
+    FSYNC_INTERVAL = 'interval'
+    FSYNC_NEVER = 'never'
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20, segment_size: int = 64 << 20, fsync: str = FSYNC_INTERVAL, fsync_interval: float = 5, compresslevel: int = 6, index_tokens: bool = True):
+        """
+        Init method that is used while creating an object of this class
+
+        If the spool already exists, new lines are appended to it. Bytes written after the last indexed member (say, by a process which crashed midway) are discarded,
+        and `next_token` is the checkpoint of the last indexed member.
+
+        Args:
+            path: spool directory; see `get_spool_path()`
+            buffer_size: number of bytes buffered in memory before they are compressed & written
+            segment_size: number of compressed bytes after which a new segment file is started
+            fsync: 'always' to fsync after every write, 'interval' to fsync at most once every `fsync_interval` seconds, or 'never' to leave it to the operating system
+            fsync_interval: seconds between two fsyncs, for fsync='interval'
+            compresslevel: gzip compression level
+            index_tokens: if True, the inverted index of the lines (order ids, tradingsymbols, levels and minutes) is built as they are written, see `LogSpoolReader.search()`
+        """
+
+        assert fsync in [self.FSYNC_ALWAYS, self.FSYNC_INTERVAL, self.FSYNC_NEVER], f'Argument "fsync" should be one of "{self.FSYNC_ALWAYS}", "{self.FSYNC_INTERVAL}" or "{self.FSYNC_NEVER}"'
+        assert buffer_size > 0 and segment_size > 0, f'Arguments "buffer_size" and "segment_size" should be positive integers'
+
+        self.path = path
+        self.buffer_size = buffer_size
+        self.segment_size = segment_size
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compresslevel = compresslevel
+        self.index_tokens = index_tokens
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._buffer_next_token = None
+        self._last_fsync = time.monotonic()
+
+        os.makedirs(path, exist_ok=True)
+        index, partial = _read_index(path)
+        if partial:
+            with open(os.path.join(path, INDEX_FILE_NAME), 'w') as f:
+                f.writelines(json.dumps(_) + '\n' for _ in index)
+        if index:
+            last = index[-1]
+            self.segment = last['segment']
+            self.line_count = last['first_line'] + last['lines']
+            self.next_token = last.get('next_token')
+            offset = last['offset'] + last['length']
+        else:
+            self.segment, self.line_count, self.next_token, offset = 0, 0, None, 0
+
+        # Drop a partially written member, then continue appending after the last indexed one
+        self._segment_file = open(os.path.join(path, SEGMENT_FILE_NAME.format(self.segment)), 'ab')
+        self._segment_file.truncate(offset)
+        self._segment_file.seek(offset)
+        self._index_file = open(os.path.join(path, INDEX_FILE_NAME), 'a')
+
+        # Drop the index batches of members which are not in the spool index, and carry the level & minute of the last record over to the next batch
+        self._tokens_file, self._tokens_context = None, {}
+        if index_tokens:
+            tokens_path = os.path.join(path, TOKENS_FILE_NAME)
+            batches = []
+            if os.path.exists(tokens_path):
+                with open(tokens_path) as f:
+                    for line in f:
+                        if not line.endswith('\n'):
+                            break
+                        batch = json.loads(line)
+                        if batch['first_line'] + batch['lines'] > self.line_count:
+                            break
+                        batches.append(line)
+                with open(tokens_path, 'w') as f:
+                    f.writelines(batches)
+            if batches:
+                last_batch = json.loads(batches[-1])
+                self._tokens_context = {'level': last_batch['level'], 'minute': last_batch['minute']}
+            elif self.line_count:
+                print(f'WARNING: The first {self.line_count} lines of the spool are not in its inverted index.')
+            self._tokens_file = open(tokens_path, 'a')
+
+    @property
+    def checkpoint(self) -> dict:
+        """
+        Point up to which the logs are safely in the spool
+
+        Returns:
+            dict with the 'next_token' to resume fetching from, the 'line' count, and the 'segment' & byte 'offset' at which the next member will be written
+        """
+
+        with self._lock:
+            return {'next_token': self.next_token, 'line': self.line_count, 'segment': self.segment, 'offset': self._segment_file.tell()}
+
+    def write(self, lines: list, next_token: str = None):
+        """
+        Append log lines
+
+        Args:
+            lines: list of log lines, say a page yielded by `AlgoBullsConnection.iter_logs()`
+            next_token: `nextForwardToken` following these lines; saved along with them as the checkpoint to resume from
+        """
+
+        with self._lock:
+            self._buffer.extend(lines)
+            self._buffered_bytes += sum(len(_) for _ in lines)
+            if next_token is not None:
+                self._buffer_next_token = next_token
+            if self._buffered_bytes >= self.buffer_size:
+                self._flush()
+
+    def flush(self):
+        """
+        Compress and write out the buffered lines
+        """
+
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+
+        text, self._buffer, self._buffered_bytes = ''.join(self._buffer), [], 0
+        next_token, self._buffer_next_token = self._buffer_next_token or self.next_token, None
+        lines = text.splitlines(keepends=True)  # counted the same way as LogSpoolReader splits them, since a log entry may span several lines
+        data = gzip.compress(text.encode(), compresslevel=self.compresslevel)
+
+        if self._segment_file.tell() > 0 and self._segment_file.tell() + len(data) > self.segment_size:
+            self._segment_file.close()
+            self.segment += 1
+            self._segment_file = open(os.path.join(self.path, SEGMENT_FILE_NAME.format(self.segment)), 'ab')
+
+        timestamps = [_ for _ in map(get_log_timestamp, lines) if _ is not None]
+        entry = {'segment': self.segment, 'offset': self._segment_file.tell(), 'length': len(data), 'first_line': self.line_count, 'lines': len(lines),
+                 'first_timestamp': timestamps[0] if timestamps else None, 'last_timestamp': timestamps[-1] if timestamps else None, 'next_token': next_token}
+
+        # The member is written before its index entry, so that the index never points to missing data
+        self._segment_file.write(data)
+        self._segment_file.flush()
+        self._sync(self._segment_file)
+        if self._tokens_file is not None:
+            batch = build_log_index_batch(lines, self.line_count, **self._tokens_context)
+            self._tokens_context = {'level': batch['level'], 'minute': batch['minute']}
+            self._tokens_file.write(json.dumps(batch) + '\n')
+            self._tokens_file.flush()
+        self._index_file.write(json.dumps(entry) + '\n')
+        self._index_file.flush()
+        self._sync(self._index_file)
+
+        self.line_count += len(lines)
+        self.next_token = next_token
+
+    def _sync(self, f):
+        if self.fsync == self.FSYNC_ALWAYS or (self.fsync == self.FSYNC_INTERVAL and time.monotonic() - self._last_fsync >= self.fsync_interval):
+            os.fsync(f.fileno())
+            if f is self._index_file:
+                self._last_fsync = time.monotonic()
+
+    def close(self):
+        """
+        Write out the buffered lines, and close the files
+        """
+
+        with self._lock:
+            self._flush()
+            for f in [self._segment_file, self._tokens_file, self._index_file]:
+                if f is None:
+                    continue
+                if self.fsync != self.FSYNC_NEVER and not f.closed:
+                    f.flush()
+                    os.fsync(f.fileno())
+                f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LogSpoolReader:
+    """
+    Reader of a spool written by `LogSpool`. The spool can be read while it is being written; only the lines flushed so far are visible.
+    """
+
+    def __init__(self, path: str):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            path: spool directory
+        """
+
+        self.path = path
+        self._log_index = LogIndex(path)
+
+    @property
+    def index(self) -> list:
+        """
+        Entries of the spool index, one per gzip member
+        """
+
+        return _read_index(self.path)[0]
+
+    def __len__(self):
+        index = self.index
+        return index[-1]['first_line'] + index[-1]['lines'] if index else 0
+
+    @property
+    def checkpoint(self) -> dict:
+        """
+        Point up to which the logs are in the spool, see `LogSpool.checkpoint`
+
+        Returns:
+            dict with the 'next_token' to resume fetching from, the 'line' count, and the 'segment' & byte 'offset' following the last member
+        """
+
+        index = self.index
+        if not index:
+            return {'next_token': None, 'line': 0, 'segment': 0, 'offset': 0}
+        last = index[-1]
+        return {'next_token': last.get('next_token'), 'line': last['first_line'] + last['lines'], 'segment': last['segment'], 'offset': last['offset'] + last['length']}
+
+    def _read_member(self, entry) -> list:
+        with open(os.path.join(self.path, SEGMENT_FILE_NAME.format(entry['segment'])), 'rb') as f:
+            f.seek(entry['offset'])
+            data = f.read(entry['length'])
+        return zlib.decompressobj(wbits=31).decompress(data).decode().splitlines(keepends=True)
+
+    def get_lines(self, line_numbers: list) -> list:
+        """
+        Fetch log lines by their numbers, decompressing only the members holding them
+
+        Args:
+            line_numbers: sorted list of line numbers (starting from 0)
+
+        Returns:
+            list of log lines
+        """
+
+        index = self.index
+        first_lines = [_['first_line'] for _ in index]
+        lines, entry, member = [], None, None
+        for number in line_numbers:
+            i = bisect.bisect_right(first_lines, number) - 1
+            if i < 0 or number >= index[i]['first_line'] + index[i]['lines']:
+                continue
+            if index[i] is not entry:
+                entry, member = index[i], self._read_member(index[i])
+            lines.append(member[number - entry['first_line']])
+        return lines
+
+    def search(self, order_id: str = None, symbol: str = None, level: str = None, start=None, end=None, return_line_numbers: bool = False) -> list:
+        """
+        Fetch the log lines matching all the given criteria, using the inverted index of the spool; see `LogIndex.lookup()`
+
+        Args:
+            order_id: order id, say to fetch all the lines of an order
+            symbol: tradingsymbol, say 'SBIN'
+            level: level, say 'ERROR'
+            start: first minute, as a datetime or a 'YYYY-MM-DD HH:MM' string; a time or an 'HH:MM' string matches that time on any date
+            end: last minute (included), in the same formats as `start`; if both are given, both are dates & times or both are times of the day
+            return_line_numbers: if True, the line numbers are returned instead of the lines
+
+        Returns:
+            list of log lines, or of line numbers
+        """
+
+        self._log_index.refresh(line_count=len(self))
+        line_numbers = self._log_index.lookup(order_id=order_id, symbol=symbol, level=level, start=start, end=end)
+        return line_numbers if return_line_numbers else self.get_lines(line_numbers)
+
+    def get_tokens(self, prefix: str = '') -> list:
+        """
+        Fetch the tokens in the inverted index of the spool
+
+        Args:
+            prefix: if given, only the tokens starting with it, say 'order:' for all the order ids
+
+        Returns:
+            sorted list of tokens
+        """
+
+        self._log_index.refresh(line_count=len(self))
+        return self._log_index.get_tokens(prefix)
+
+    def iter_lines(self, start_line: int = 0):
+        """
+        Iterate over the log lines, one member at a time
+
+        Args:
+            start_line: number (starting from 0) of the first line to be yielded
+
+        Yields:
+            log lines
+        """
+
+        index = self.index
+        i = max(0, bisect.bisect_right([_['first_line'] for _ in index], start_line) - 1)
+        for entry in index[i:]:
+            lines = self._read_member(entry)
+            yield from lines[max(0, start_line - entry['first_line']):]
+
+    def __iter__(self):
+        return self.iter_lines()
+
+    def tail(self, n: int = 10) -> list:
+        """
+        Fetch the last log lines, decompressing only the members holding them
+
+        Args:
+            n: number of lines
+
+        Returns:
+            list of the last n log lines
+        """
+
+        return list(self.iter_lines(start_line=max(0, len(self) - n)))
+
+    def seek(self, timestamp: [dt, str]):
+        """
+        Iterate over the log lines, starting from the first line logged at or after a timestamp
+
+        Args:
+            timestamp: datetime, or string in the format of the log timestamps (say '2021-08-13 09:15:00,000')
+
+        Yields:
+            log lines
+        """
+
+        # Log timestamps (say '2021-08-13 09:15:00,000') sort in time order as strings
+        timestamp = timestamp.strftime(LOG_TIMESTAMP_FORMAT)[:23] if isinstance(timestamp, dt) else timestamp
+        index = self.index
+
+        # The first member whose last timestamp is not before the timestamp holds the first such line
+        for i, entry in enumerate(index):
+            if entry['last_timestamp'] is not None and entry['last_timestamp'] >= timestamp:
+                break
+        else:
+            return
+
+        found = False
+        for entry in index[i:]:
+            for line in self._read_member(entry):
+                if not found:
+                    _timestamp = get_log_timestamp(line)
+                    if _timestamp is None or _timestamp < timestamp:
+                        continue
+                    found = True
+                yield line
@@ -0,0 +1,140 @@
+"""
+Module for recording per-endpoint metrics of the calls made to the [AlgoBulls](https://www.algobulls.com) backend.
+"""
+import bisect
+import threading
+from collections import defaultdict
+
+
+class APIMetrics:
+    """
+    Registry of request counts, latency histograms, retries and bytes moved, per (method, endpoint template).
+
+    Endpoint templates have their ids & keys masked, so access keys and strategy codes never end up in the metrics.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            buckets: upper bounds (in seconds) of the latency histogram buckets
+        """
+
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all the recorded metrics
+        """
+
+        with self._lock:
+            self._requests = defaultdict(int)  # (method, endpoint, status) to count
+            self._latency = defaultdict(lambda: {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0})  # (method, endpoint) to histogram; the last bucket is +Inf
+            self._retries = defaultdict(int)  # (method, endpoint) to count
+            self._bytes = defaultdict(lambda: {'sent': 0, 'received': 0, 'decoded': 0})  # (method, endpoint) to byte counts
+
+    def record(self, method: str, endpoint: str, status, latency: float, bytes_sent: int = 0, bytes_received: int = 0, bytes_decoded: int = 0):
+        """
+        Record a completed request
+
+        Args:
+            method: HTTP method
+            endpoint: endpoint template
+            status: HTTP status code, or the name of the exception if no response was received
+            latency: time taken (in seconds)
+            bytes_sent: size of the request body
+            bytes_received: size of the response body on the wire
+            bytes_decoded: size of the response body after decoding the content encoding
+        """
+
+        method = method.upper()
+        with self._lock:
+            self._requests[(method, endpoint, str(status))] += 1
+            histogram = self._latency[(method, endpoint)]
+            histogram['buckets'][bisect.bisect_left(self.buckets, latency)] += 1
+            histogram['sum'] += latency
+            histogram['count'] += 1
+            _bytes = self._bytes[(method, endpoint)]
+            _bytes['sent'] += bytes_sent
+            _bytes['received'] += bytes_received
+            _bytes['decoded'] += bytes_decoded
+
+    def record_retry(self, method: str, endpoint: str):
+        """
+        Record a retried request
+
+        Args:
+            method: HTTP method
+            endpoint: endpoint template
+        """
+
+        with self._lock:
+            self._retries[(method.upper(), endpoint)] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Fetch the recorded metrics
+
+        Returns:
+            dict of '<METHOD> <endpoint template>' to a dict with the keys 'requests' (per status), 'latency' (histogram with cumulative bucket counts, sum & count), 'retries' and 'bytes'
+        """
+
+        with self._lock:
+            snapshot = {}
+            for (method, endpoint), histogram in self._latency.items():
+                cumulative, counts = 0, {}
+                for le, count in zip(list(self.buckets) + ['+Inf'], histogram['buckets']):
+                    cumulative += count
+                    counts[le] = cumulative
+                snapshot[f'{method} {endpoint}'] = {
+                    'requests': {status: count for (_method, _endpoint, status), count in self._requests.items() if (_method, _endpoint) == (method, endpoint)},
+                    'latency': {'buckets': counts, 'sum': histogram['sum'], 'count': histogram['count'], 'mean': histogram['sum'] / histogram['count'] if histogram['count'] else None},
+                    'retries': self._retries.get((method, endpoint), 0),
+                    'bytes': dict(self._bytes[(method, endpoint)]),
+                }
+            for (method, endpoint), count in self._retries.items():
+                snapshot.setdefault(f'{method} {endpoint}', {'requests': {}, 'latency': None, 'retries': count, 'bytes': None})
+            return snapshot
+
+    def to_prometheus(self, prefix: str = 'algobulls_api') -> str:
+        """
+        Export the recorded metrics in the Prometheus text exposition format
+
+        Args:
+            prefix: prefix of the metric names
+
+        Returns:
+            metrics as text
+        """
+
+        def _labels(**kwargs):
+            return '{' + ','.join(f'{k}="{v}"' for k, v in kwargs.items()) + '}'
+
+        with self._lock:
+            lines = [f'# HELP {prefix}_requests_total Requests made to the AlgoBulls backend', f'# TYPE {prefix}_requests_total counter']
+            lines += [f'{prefix}_requests_total{_labels(method=method, endpoint=endpoint, status=status)} {count}' for (method, endpoint, status), count in sorted(self._requests.items())]
+
+            lines += [f'# HELP {prefix}_request_duration_seconds Latency of the requests made to the AlgoBulls backend', f'# TYPE {prefix}_request_duration_seconds histogram']
+            for (method, endpoint), histogram in sorted(self._latency.items()):
+                cumulative = 0
+                for le, count in zip(list(self.buckets) + ['+Inf'], histogram['buckets']):
+                    cumulative += count
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{_labels(method=method, endpoint=endpoint, le=le)} {cumulative}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{_labels(method=method, endpoint=endpoint)} {histogram["sum"]}')
+                lines.append(f'{prefix}_request_duration_seconds_count{_labels(method=method, endpoint=endpoint)} {histogram["count"]}')
+
+            lines += [f'# HELP {prefix}_retries_total Requests retried after a failure', f'# TYPE {prefix}_retries_total counter']
+            lines += [f'{prefix}_retries_total{_labels(method=method, endpoint=endpoint)} {count}' for (method, endpoint), count in sorted(self._retries.items())]
+
+            for direction, description in [('sent', 'Bytes of the request bodies sent to the AlgoBulls backend'),
+                                           ('received', 'Bytes of the response bodies received from the AlgoBulls backend, as transferred (before decompression)'),
+                                           ('decoded', 'Bytes of the response bodies received from the AlgoBulls backend, after decompression')]:
+                lines += [f'# HELP {prefix}_bytes_{direction}_total {description}', f'# TYPE {prefix}_bytes_{direction}_total counter']
+                lines += [f'{prefix}_bytes_{direction}_total{_labels(method=method, endpoint=endpoint)} {_bytes[direction]}' for (method, endpoint), _bytes in sorted(self._bytes.items())]
+
+        return '\n'.join(lines) + '\n'
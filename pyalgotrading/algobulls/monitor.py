@@ -0,0 +1,368 @@
+"""
+Module for monitoring many BT/PT/RT jobs on the [AlgoBulls](https://www.algobulls.com) platform at once.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from tabulate import tabulate
+
+from .log_parser import get_last_log_timestamp, parse_log_line
+from .polling import AdaptivePoller
+from .retry import RetryPolicy
+from ..constants import ExecutionStatus, TradingType, CandleIntervalSecondsMap
+
+JOB_SUBMITTED = 'SUBMITTED'
+JOB_LIFECYCLE = [JOB_SUBMITTED] + [_.value for _ in ExecutionStatus]  # states of a job, in order
+# seconds after the submission for which a STOPPING or STOPPED status of a job not yet seen STARTING or STARTED is taken as stale, i.e. of the previous job of the same strategy;
+# a job which runs entirely between two polls is taken as completed once they are over
+SUBMITTED_GRACE_SECONDS = 60
+MONITOR_STATUS_FAMILY = 'job_control'  # endpoint families of the requests made by a JobMonitor; see ENDPOINT_FAMILY_MAP in the api module
+MONITOR_LOGS_FAMILY = 'logs'
+
+
+class MonitoredJob:
+    """
+    State of a job watched by a `JobMonitor`.
+
+    The status moves forward only, along `JOB_LIFECYCLE` (SUBMITTED, STARTING, STARTED, STOPPING, STOPPED); a status read from the platform which is behind the current one is stale and ignored.
+    """
+
+    def __init__(self, strategy_code: str, trading_type: TradingType, start_timestamp=None, end_timestamp=None, initial_next_token: str = None, poller: AdaptivePoller = None, status: str = None):
+        self.strategy_code = strategy_code
+        self.trading_type = trading_type
+        self.start_timestamp = start_timestamp.replace(tzinfo=None) if start_timestamp is not None else None  # log timestamps are naive
+        self.end_timestamp = end_timestamp.replace(tzinfo=None) if end_timestamp is not None else None
+        self.next_token = initial_next_token  # log cursor; the `nextForwardToken` of the last page fetched
+        self.poller = poller or AdaptivePoller()
+        self.status = status  # None until the first status poll, unless the job was submitted by the monitor
+        self.submitted_at = time.monotonic() if status == JOB_SUBMITTED else None
+        self.lines = 0
+        self.pages = 0
+        self.trades = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_timestamp = None
+        self.done = False
+        self.updated_at = None
+
+    @property
+    def key(self) -> tuple:
+        return self.strategy_code, self.trading_type
+
+    def transition(self, status: str) -> bool:
+        """
+        Move the job to a status read from the platform
+
+        Args:
+            status: status read from the platform
+
+        Returns:
+            True if the status of the job changed, False if it is the same or the read is stale
+        """
+
+        if self.status is not None and status in JOB_LIFECYCLE and self.status in JOB_LIFECYCLE:
+            if JOB_LIFECYCLE.index(status) <= JOB_LIFECYCLE.index(self.status):
+                return False
+            if self.status == JOB_SUBMITTED and status in [ExecutionStatus.STOPPING.value, ExecutionStatus.STOPPED.value] and time.monotonic() - self.submitted_at < SUBMITTED_GRACE_SECONDS:
+                return False
+        elif status == self.status:
+            return False
+        self.status = status
+        return True
+
+    @property
+    def progress(self) -> float:
+        """
+        Fraction (0 to 1) of the job's time range covered by the logs fetched so far, or None if the time range is not known
+        """
+
+        if self.done and self.status == ExecutionStatus.STOPPED.value:
+            return 1.0
+        if self.start_timestamp is None or self.end_timestamp is None or self.last_timestamp is None:
+            return None
+        total_seconds = (self.end_timestamp - self.start_timestamp).total_seconds()
+        return min(1.0, max(0.0, (self.last_timestamp - self.start_timestamp).total_seconds() / total_seconds)) if total_seconds > 0 else None
+
+    def to_dict(self) -> dict:
+        return {'strategy_code': self.strategy_code, 'trading_type': self.trading_type.name, 'status': self.status, 'progress': self.progress, 'lines': self.lines, 'pages': self.pages, 'trades': self.trades,
+                'last_timestamp': self.last_timestamp, 'next_token': self.next_token, 'errors': self.errors, 'done': self.done}
+
+
+class JobMonitor:
+    """
+    Watches the status and logs of many jobs from a single asyncio event loop.
+
+    Every job is polled on its own adaptive schedule (see `AdaptivePoller`), while all the requests draw from the rate limits of the connection (see `RateLimiter`), shared with its other callers.
+    Callbacks are called in order on a separate thread, so a slow callback (say, one fetching the reports of a completed job) never delays the polls.
+    """
+
+    def __init__(self, connection, rate: float = None, max_concurrency: int = None, on_status=None, on_log_page=None, on_trade=None, on_complete=None, on_error=None, callback_workers: int = 1):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            connection: AlgoBullsConnection object
+            rate: if given, the 'job_control' (status) and 'logs' requests of the connection are limited to this many per second each, across all the jobs and the other callers of the
+                connection; None keeps the limits already set on `connection.api.rate_limiter`
+            max_concurrency: maximum number of requests in flight at once; defaults to the `max_concurrency` of `connection.async_api`
+            on_status: called as `on_status(job, old_status, new_status)` when the status of a job changes
+            on_log_page: called as `on_log_page(job, lines)` for every page of log lines of a job
+            on_trade: called as `on_trade(job, record)` for every order event in the logs of a job, with the record parsed by `parse_log_line()`
+            on_complete: called as `on_complete(job)` once a job has stopped and all its logs are fetched
+            on_error: called as `on_error(job, exception)` when fetching the status or logs of a job fails, even after retries
+            callback_workers: number of threads calling the callbacks; with more than 1, the callbacks of a job may run out of order
+        """
+
+        self.connection = connection
+        self.async_api = connection.async_api
+        if rate is not None:
+            for family in [MONITOR_STATUS_FAMILY, MONITOR_LOGS_FAMILY]:
+                connection.api.rate_limiter.set_limit(family, rate=rate)
+        self.max_concurrency = max_concurrency or self.async_api.max_concurrency
+        self.retry_policy = RetryPolicy(max_attempts=3, base_delay=1)
+        connection.api.track_retries(self.retry_policy)
+        self.callbacks = {'on_status': on_status, 'on_log_page': on_log_page, 'on_trade': on_trade, 'on_complete': on_complete, 'on_error': on_error}
+        self.callback_workers = callback_workers
+        self.jobs = {}
+        self.requests = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._callback_executor = None
+
+    def add_job(self, strategy_code: str, trading_type: TradingType, start_timestamp=None, end_timestamp=None, initial_next_token: str = None, status: str = None) -> MonitoredJob:
+        """
+        Start watching a job. Jobs can be added while the monitor is running.
+
+        Args:
+            strategy_code: strategy code
+            trading_type: trading type
+            start_timestamp: start of the time range of the job, for tracking its progress; defaults to the one saved by the last `start_job()` of the connection for this strategy
+            end_timestamp: end of the time range of the job
+            initial_next_token: log cursor to resume from; None fetches the logs from the beginning
+            status: known status of the job, say SUBMITTED for a job just submitted; None takes the first status read from the platform
+
+        Returns:
+            the MonitoredJob
+        """
+
+        assert isinstance(strategy_code, str), f'Argument "strategy_code" should be a string'
+        assert isinstance(trading_type, TradingType), f'Argument "trading_type" should be an enum of type {TradingType.__name__}'
+
+        saved_parameters = self.connection.saved_parameters
+        if saved_parameters.get('strategy_code') == strategy_code:
+            start_timestamp = start_timestamp or saved_parameters['start_timestamp_map'].get(trading_type)
+            end_timestamp = end_timestamp or saved_parameters['end_timestamp_map'].get(trading_type)
+
+        if trading_type is TradingType.BACKTESTING:
+            poller = AdaptivePoller()
+        else:
+            candle_interval = saved_parameters.get('candle_interval') if saved_parameters.get('strategy_code') == strategy_code else None
+            candle_seconds = CandleIntervalSecondsMap[candle_interval.value] if candle_interval is not None else 60
+            poller = AdaptivePoller(max_interval=candle_seconds, candle_interval=candle_seconds)
+
+        job = MonitoredJob(strategy_code, trading_type, start_timestamp=start_timestamp, end_timestamp=end_timestamp, initial_next_token=initial_next_token, poller=poller, status=status)
+        self.jobs[job.key] = job
+        if status is not None:
+            self._callback('on_status', job, None, status)
+        return job
+
+    def submit(self, strategy_code: str, trading_type: TradingType, **start_job_kwargs) -> MonitoredJob:
+        """
+        Submit a job with `AlgoBullsConnection.start_job()` and start watching it, in SUBMITTED status
+
+        Args:
+            strategy_code: strategy code
+            trading_type: trading type
+            start_job_kwargs: other arguments of `AlgoBullsConnection.start_job()`
+
+        Returns:
+            the MonitoredJob, or None if the platform refused the submission
+        """
+
+        if self.connection.start_job(strategy_code=strategy_code, trading_type=trading_type, **start_job_kwargs) is None:
+            return None
+        return self.add_job(strategy_code, trading_type, status=JOB_SUBMITTED)
+
+    def _callback(self, name, *args):
+        callback = self.callbacks[name]
+        if callback is None:
+            return
+        if self._callback_executor is None:
+            self._call(name, callback, args)
+        else:
+            self._callback_executor.submit(self._call, name, callback, args)
+
+    @staticmethod
+    def _call(name, callback, args):
+        try:
+            callback(*args)
+        except Exception as ex:
+            print(f'Error in callback {name}: {ex!r}')
+
+    async def _request(self, semaphore, family, coroutine_function, *args, **kwargs):
+        # One request to an endpoint family, once the rate limits of the connection allow it; retried on 5xx.
+        # The wait is on the event loop, and the request takes its token on an API thread, which seldom has to wait for it then
+        rate_limiter = self.connection.api.rate_limiter
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            wait = rate_limiter.get_wait(family)
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = rate_limiter.get_wait(family)
+            try:
+                async with semaphore:
+                    self.requests += 1
+                    return await coroutine_function(*args, **kwargs)
+            except Exception as ex:
+                if not self.retry_policy.is_retryable(ex) or attempt == self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.get_delay(attempt, ex)
+                self.retry_policy.notify_retry(attempt, ex, delay)
+                await asyncio.sleep(delay)
+
+    async def _update_status(self, semaphore, job):
+        status = (await self._request(semaphore, MONITOR_STATUS_FAMILY, self.async_api.get_job_status, job.strategy_code, job.trading_type))['message']
+        old_status = job.status
+        if job.transition(status):
+            self._callback('on_status', job, old_status, status)
+        return job.status
+
+    async def _watch(self, semaphore, job):
+        poller = job.poller
+        while not self._stop.is_set() and not job.done:
+            try:
+                if job.status in [None, JOB_SUBMITTED, ExecutionStatus.STARTING.value]:
+                    if await self._update_status(semaphore, job) in [JOB_SUBMITTED, ExecutionStatus.STARTING.value]:
+                        await poller.wait_async(poller.on_empty())
+                    continue
+
+                response = await self._request(semaphore, MONITOR_LOGS_FAMILY, self.async_api.get_logs, job.strategy_code, job.trading_type, initial_next_token=job.next_token)
+                lines = response.get('data') or []
+                job.next_token = response.get('nextForwardToken', job.next_token)
+                job.updated_at = time.time()
+
+                if not lines:
+                    if await self._update_status(semaphore, job) in [ExecutionStatus.STOPPED.value, ExecutionStatus.STOPPING.value]:
+                        job.done = True
+                        self._callback('on_complete', job)
+                        return
+                    await poller.wait_async(poller.on_empty())
+                    continue
+
+                job.pages += 1
+                job.lines += len(lines)
+                job.last_timestamp = get_last_log_timestamp(lines) or job.last_timestamp
+                self._callback('on_log_page', job, lines)
+                for line in lines:
+                    # order events are logged by the 'order' module, with the order id
+                    if '] [order] ' in line:
+                        record = parse_log_line(line)
+                        if record is not None and record['module'] == 'order' and record['order_id'] is not None:
+                            job.trades += 1
+                            self._callback('on_trade', job, record)
+                await poller.wait_async(poller.on_page(len(lines), self.connection.api.page_size))
+
+            except Exception as ex:
+                job.errors += 1
+                job.last_error = ex
+                self._callback('on_error', job, ex)
+                await poller.wait_async(poller.on_empty())
+
+    async def run_async(self, keep_alive: bool = False):
+        """
+        Watch all the jobs until every one of them is done, or `stop()` is called. Jobs added meanwhile are picked up.
+
+        Args:
+            keep_alive: if True, keep running (waiting for new jobs) once all the jobs are done, until `stop()` is called
+        """
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = {}  # MonitoredJob to its task; keyed by the job rather than by strategy code & trading type, since a later job of the same strategy & trading type replaces the earlier one
+        while not self._stop.is_set():
+            jobs = list(self.jobs.values())
+            for job in jobs:
+                if job not in tasks and not job.done:
+                    tasks[job] = asyncio.ensure_future(self._watch(semaphore, job))
+            # forget the tasks of the jobs which are done and were replaced by a later job
+            for job in [_ for _, task in tasks.items() if task.done() and _ not in jobs]:
+                del tasks[job]
+            pending = [_ for _ in tasks.values() if not _.done()]
+            if not pending:
+                if not keep_alive:
+                    break
+                await asyncio.sleep(0.5)
+                continue
+            await asyncio.wait(pending, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+
+        for task in tasks.values():
+            task.cancel()
+
+    def run(self, display: bool = False, refresh_interval: float = 5):
+        """
+        Watch all the jobs until every one of them is done, blocking the caller
+
+        Args:
+            display: if True, the aggregate view is printed every `refresh_interval` seconds
+            refresh_interval: seconds between two prints of the aggregate view
+        """
+
+        self.start()
+        while self._thread.is_alive():
+            self._thread.join(refresh_interval)
+            if display:
+                print(f'\n{self.render()}\n')
+
+    def start(self, keep_alive: bool = False):
+        """
+        Watch all the jobs on a background thread, returning immediately
+
+        Args:
+            keep_alive: if True, keep watching (say, for jobs submitted later with `submit()`) until `stop()` is called
+        """
+
+        self._stop.clear()
+        self._callback_executor = ThreadPoolExecutor(max_workers=self.callback_workers, thread_name_prefix='algobulls-job-callbacks')
+        self._thread = threading.Thread(target=self._run_thread, args=(keep_alive,), name='algobulls-job-monitor', daemon=True)
+        self._thread.start()
+
+    def _run_thread(self, keep_alive):
+        try:
+            asyncio.run(self.run_async(keep_alive=keep_alive))
+        finally:
+            # the thread ends once the pending callbacks are done, hence run() returns after the last on_complete
+            self._callback_executor.shutdown(wait=True)
+            self._callback_executor = None
+
+    def stop(self):
+        """
+        Stop watching the jobs
+        """
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Fetch the aggregate view of all the jobs
+
+        Returns:
+            DataFrame with one row per job
+        """
+
+        return pd.DataFrame([job.to_dict() for job in self.jobs.values()])
+
+    def render(self) -> str:
+        """
+        Render the aggregate view of all the jobs as a table
+
+        Returns:
+            table as text
+        """
+
+        rows = [[job.strategy_code, job.trading_type.name, job.status, f'{job.progress:.0%}' if job.progress is not None else '-', job.lines, job.trades, job.last_timestamp, job.errors] for job in self.jobs.values()]
+        done = sum(job.done for job in self.jobs.values())
+        table = tabulate(rows, headers=['Strategy', 'Trading Type', 'Status', 'Progress', 'Lines', 'Trades', 'Last Log Timestamp', 'Errors'], tablefmt='fancy_grid')
+        return f'{table}\nJobs done: {done}/{len(self.jobs)} | Requests: {self.requests}'
@@ -0,0 +1,224 @@
+"""
+Module for the order history of a strategy execution, as columns built once from the order records fetched from the [AlgoBulls](https://www.algobulls.com) backend.
+
+Every order record holds the order details and a list of states ('customer_tradebook_states'), say:
+    {'orderId': '8e42ef93b9184169a91f17dc7d5e6bee', 'transaction_type': 'BUY', 'instrument': 'NSE_EQ:HINDALCO', 'quantity': 1, 'currency': '₹', 'price': 412.5,
+     'customer_tradebook_states': [{'timestamp_created': '2021-08-13T09:15:00+05:30', 'state': 'OPEN'}, ...]}
+"""
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+ORDER_COLUMNS = ['orderId', 'transaction_type', 'instrument', 'quantity', 'currency', 'price']
+ORDER_STATES_KEY = 'customer_tradebook_states'
+ORDER_HISTORY_COLUMNS = ['timestamp_created', 'transaction_type', 'state', 'instrument', 'quantity', 'currency', 'price']
+ORDER_SEPARATOR = '\n' + '======' * 15 + '\n'
+
+
+def _is_text(value) -> bool:
+    # True for the values tabulate surely treats as text, i.e. strings which are neither missing (''), booleans nor numbers (with thousands separators too, say '1,000');
+    # a column holding one such value is formatted as text, any other column is left to tabulate
+    if not isinstance(value, str) or value in ('', 'True', 'False'):
+        return False
+    try:
+        float(value.replace(',', ''))
+    except ValueError:
+        return True
+    return False
+
+
+def _is_plain(cell: str) -> bool:
+    # True for single-line text whose width is its length, i.e. without ANSI codes, wide or zero-width characters
+    if '\n' in cell or '\x1b' in cell:
+        return False
+    return cell.isascii() or all(unicodedata.east_asian_width(_) not in 'WF' and unicodedata.category(_) not in ('Mn', 'Me', 'Cf') for _ in cell)
+
+
+def _format_psql(columns: list, headers: list = None) -> str:
+    """
+    Same text as `tabulate(list(zip(*columns)), headers, tablefmt='psql')`.
+
+    Tables whose columns all hold some text (tabulate formats those as strings, left aligned) are formatted here, without tabulate's per-cell type inference;
+    other tables (say, with a column of numbers, or of missing values only) are left to tabulate.
+    """
+
+    cells = []
+    for column in columns:
+        if not any(_is_text(_) for _ in column):
+            return tabulate(list(zip(*columns)), headers=headers or (), tablefmt='psql')
+        column = ['' if _ is None else str(_).strip() for _ in column]
+        if not all(_is_plain(_) for _ in column):
+            return tabulate(list(zip(*columns)), headers=headers or (), tablefmt='psql')
+        cells.append(column)
+    if headers is not None and not all(_is_plain(_) for _ in headers):
+        return tabulate(list(zip(*columns)), headers=headers, tablefmt='psql')
+
+    if headers is None:
+        widths = [max(map(len, _)) for _ in cells]
+    else:
+        widths = [max(len(header) + 2, max(map(len, column))) for header, column in zip(headers, cells)]
+    border = '+' + '+'.join('-' * (_ + 2) for _ in widths) + '+'
+    lines = [border]
+    if headers is not None:
+        lines.append('| ' + ' | '.join(header.ljust(width) for header, width in zip(headers, widths)) + ' |')
+        lines.append('|' + '+'.join('-' * (_ + 2) for _ in widths) + '|')
+    lines.extend('| ' + ' | '.join(cell.ljust(width) for cell, width in zip(row, widths)) + ' |' for row in zip(*cells))
+    lines.append(border)
+    return '\n'.join(lines)
+
+
+class OrderHistoryTable:
+    """
+    Columnar table of order records, with one row per order and one row per order state.
+
+    The text rendering (one table of details and one table of states per order) is built lazily, order by order, hence it can be paginated with `render()` or streamed to a file with `write()`
+    without holding the text of all the orders in memory.
+    """
+
+    def __init__(self, records: list = None):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            records: list of order records, say the pages of `v5/build/python/user/order/charts`
+        """
+
+        self.columns = {_: [] for _ in ORDER_COLUMNS}
+        self.state_columns = {}  # key of the order states to values, one per state
+        self.state_offsets = [0]  # states of the i-th order are the rows state_offsets[i]:state_offsets[i + 1] of state_columns
+        self.state_keys = []  # keys of the states of every order, in order of appearance; shared between the orders with the same keys
+        self._state_keys = {}
+        if records:
+            self.extend(records)
+
+    def __len__(self):
+        return len(self.columns['orderId'])
+
+    def __str__(self):
+        return self.render()
+
+    def extend(self, records: list):
+        """
+        Append order records
+
+        Args:
+            records: list of order records
+        """
+
+        _columns = [(_, self.columns[_]) for _ in ORDER_COLUMNS]
+        state_columns, state_offsets = self.state_columns, self.state_offsets
+        for record in records:
+            for key, column in _columns:
+                column.append(record.get(key))
+            states = record.get(ORDER_STATES_KEY) or []
+            keys = {}
+            for state in states:
+                keys.update(dict.fromkeys(state))
+            keys = tuple(keys)
+            self.state_keys.append(self._state_keys.setdefault(keys, keys))
+            for key in keys:
+                if key not in state_columns:
+                    state_columns[key] = [None] * state_offsets[-1]
+            for key, column in state_columns.items():
+                column.extend(_.get(key) for _ in states)
+            state_offsets.append(state_offsets[-1] + len(states))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Fetch the order history as a DataFrame
+
+        Returns:
+            DataFrame indexed by order id, with one row per order state (or one row, without state, for an order without states) sorted by 'timestamp_created', and the columns in
+            `ORDER_HISTORY_COLUMNS`. 'quantity' and 'price' are numeric, the low-cardinality columns are categorical
+        """
+
+        offsets = np.array(self.state_offsets)
+        counts = np.diff(offsets)
+        empty = np.flatnonzero(counts == 0)
+        repeats = np.maximum(counts, 1)
+
+        def _get_state_column(key):
+            column = np.array(self.state_columns.get(key, [None] * offsets[-1]), dtype=object)
+            # orders without states get a row of missing values, same as when exploding the states
+            return np.insert(column, offsets[empty], None) if len(empty) else column
+
+        def _get_order_column(key, categorical=False):
+            if categorical:
+                column = pd.Categorical(self.columns[key])
+                return pd.Categorical.from_codes(np.repeat(column.codes, repeats), column.categories)
+            return np.repeat(np.array(self.columns[key]), repeats)
+
+        df = pd.DataFrame({
+            'timestamp_created': _get_state_column('timestamp_created'),
+            'transaction_type': _get_order_column('transaction_type', categorical=True),
+            'state': pd.Categorical(_get_state_column('state')),
+            'instrument': _get_order_column('instrument', categorical=True),
+            'quantity': pd.to_numeric(_get_order_column('quantity')),
+            'currency': _get_order_column('currency', categorical=True),
+            'price': pd.to_numeric(_get_order_column('price')),
+        }, index=pd.Index(_get_order_column('orderId'), dtype=object, name='orderId'), columns=ORDER_HISTORY_COLUMNS)
+        return df.sort_values('timestamp_created', kind='stable')
+
+    def _render_order(self, index: int) -> str:
+        columns = self.columns
+        details = _format_psql([
+            ['Order ID', 'Transaction Type', 'Instrument', 'Quantity', 'Price'],
+            [columns['orderId'][index], columns['transaction_type'][index], columns['instrument'][index], columns['quantity'][index], str(columns['currency'][index]) + str(columns['price'][index])]
+        ])
+
+        # every key of the states of the order gets a column, same as tabulate(states, headers='keys'); a state without a key shows an empty cell
+        start, end = self.state_offsets[index], self.state_offsets[index + 1]
+        keys = self.state_keys[index]
+        states = _format_psql([self.state_columns[key][start:end] for key in keys], headers=list(keys)) if keys else ''
+        return details + '\n' + states + '\n' + ORDER_SEPARATOR
+
+    def iter_text(self, start: int = 0, stop: int = None):
+        """
+        Render the orders as text, lazily
+
+        Args:
+            start: index of the first order
+            stop: index of the order to stop at (excluded); None means up to the last order
+
+        Returns:
+            generator of the text of every order
+        """
+
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self._render_order(index)
+
+    def render(self, start: int = 0, stop: int = None) -> str:
+        """
+        Render the orders as text
+
+        Args:
+            start: index of the first order; say, page * page_size for a page of orders
+            stop: index of the order to stop at (excluded); None means up to the last order
+
+        Returns:
+            text of the orders
+        """
+
+        return ''.join(self.iter_text(start=start, stop=stop))
+
+    def write(self, file, start: int = 0, stop: int = None, chunk_size: int = 1000):
+        """
+        Stream the orders, rendered as text, to a file
+
+        Args:
+            file: path of the file, or a text file object
+            start: index of the first order
+            stop: index of the order to stop at (excluded); None means up to the last order
+            chunk_size: number of orders rendered per write
+        """
+
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'w', encoding='utf-8') as f:
+                return self.write(f, start=start, stop=stop, chunk_size=chunk_size)
+
+        start, stop, _ = slice(start, stop).indices(len(self))
+        for _start in range(start, stop, chunk_size):
+            file.write(self.render(start=_start, stop=min(stop, _start + chunk_size)))
@@ -0,0 +1,155 @@
+"""
+Module for scheduling the polls of job status and logs on the [AlgoBulls](https://www.algobulls.com) backend.
+"""
+import asyncio
+import time
+
+
+class AdaptivePoller:
+    """
+    Adaptive delay between two polls.
+
+    * A full page means the client is behind the job, so the next page is fetched right away.
+    * A partial page means the client has caught up, so the next poll happens after `base_interval`.
+    * An empty page (or a job still STARTING) backs off exponentially up to `max_interval`.
+    * With a `candle_interval` (Paper Trading / Real Trading), new logs are expected only at candle boundaries. An empty page after the logs of the current candle were received waits until
+      `candle_offset` seconds after the next candle boundary, and a backed-off poll is never scheduled later than that.
+    """
+
+    def __init__(self, min_interval: float = 0, base_interval: float = 1, max_interval: float = 5, backoff: float = 2, candle_interval: float = None, candle_offset: float = 1):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            min_interval: delay (in seconds) after a full page
+            base_interval: delay (in seconds) after a partial page, and the first delay after an empty page
+            max_interval: upper limit (in seconds) on a delay
+            backoff: factor by which the delay grows after every empty page
+            candle_interval: candle interval (in seconds) of the strategy, if polls should be aligned to candle boundaries
+            candle_offset: delay (in seconds) after a candle boundary, giving the strategy time to process the candle
+        """
+
+        assert 0 <= min_interval <= base_interval <= max_interval, f'Arguments should satisfy 0 <= "min_interval" <= "base_interval" <= "max_interval"'
+        assert backoff >= 1, f'Argument "backoff" should be at least 1'
+
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.candle_interval = candle_interval
+        self.candle_offset = candle_offset
+        self._interval = base_interval
+        self._behind_since = None
+        self._last_page_candle = None
+        self.stats = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clear the stats
+        """
+
+        self.stats = {'polls': 0, 'full': 0, 'partial': 0, 'empty': 0, 'sleep_time': 0.0, 'catch_up_latencies': []}
+
+    def get_time_to_next_candle(self) -> float:
+        """
+        Fetch the time until `candle_offset` seconds after the next candle boundary
+
+        Returns:
+            time in seconds, or None if no candle interval is set
+        """
+
+        if not self.candle_interval:
+            return None
+        return self.candle_interval - (time.time() - self.candle_offset) % self.candle_interval
+
+    def on_page(self, lines: int, page_size: int) -> float:
+        """
+        Compute the delay after a page of logs was fetched
+
+        Args:
+            lines: number of lines in the page
+            page_size: maximum number of lines in a page
+
+        Returns:
+            delay in seconds
+        """
+
+        if lines == 0:
+            return self.on_empty()
+
+        self.stats['polls'] += 1
+        self._interval = self.base_interval
+        if self.candle_interval:
+            self._last_page_candle = (time.time() - self.candle_offset) // self.candle_interval
+        if lines >= page_size:
+            self.stats['full'] += 1
+            if self._behind_since is None:
+                self._behind_since = time.monotonic()
+            return self.min_interval
+
+        self.stats['partial'] += 1
+        if self._behind_since is not None:
+            # time taken to drain the backlog, from the first full page to the first partial page
+            self.stats['catch_up_latencies'].append(time.monotonic() - self._behind_since)
+            self._behind_since = None
+        return self.base_interval
+
+    def on_empty(self) -> float:
+        """
+        Compute the delay after an empty page of logs, or a poll finding the job still STARTING
+
+        Returns:
+            delay in seconds
+        """
+
+        self.stats['polls'] += 1
+        self.stats['empty'] += 1
+        if self._behind_since is not None:
+            self.stats['catch_up_latencies'].append(time.monotonic() - self._behind_since)
+            self._behind_since = None
+
+        delay = self._interval
+        self._interval = min(self.max_interval, self._interval * self.backoff)
+        time_to_next_candle = self.get_time_to_next_candle()
+        if time_to_next_candle is not None:
+            # The logs of the current candle are in, and nothing more is expected before the next candle. Otherwise keep backing off, but not beyond the next candle
+            if self._last_page_candle == (time.time() - self.candle_offset) // self.candle_interval:
+                return time_to_next_candle
+            delay = min(delay, time_to_next_candle)
+        return delay
+
+    def wait(self, delay: float):
+        """
+        Sleep for a delay computed by `on_page()` or `on_empty()`
+
+        Args:
+            delay: delay in seconds
+        """
+
+        if delay > 0:
+            self.stats['sleep_time'] += delay
+            time.sleep(delay)
+
+    async def wait_async(self, delay: float):
+        """
+        Coroutine version of `wait()`, for polls scheduled on an asyncio event loop
+
+        Args:
+            delay: delay in seconds
+        """
+
+        if delay > 0:
+            self.stats['sleep_time'] += delay
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> dict:
+        """
+        Fetch the stats
+
+        Returns:
+            dict with the number of polls (and how many returned full, partial and empty pages), the total sleep time, and the mean & max catch-up latency (in seconds)
+        """
+
+        latencies = self.stats['catch_up_latencies']
+        return dict(self.stats, catch_up_latency_mean=sum(latencies) / len(latencies) if latencies else None, catch_up_latency_max=max(latencies) if latencies else None)
@@ -0,0 +1,218 @@
+"""
+Module for client-side rate limiting of calls to the [AlgoBulls](https://www.algobulls.com) backend.
+"""
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all the threads of a process.
+
+    Tokens are refilled at `rate` per second up to `capacity`; every request takes one token, waiting for it if the bucket is empty.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            rate: sustained number of requests per second
+            capacity: maximum burst size; defaults to `rate` (i.e. one second worth of requests)
+        """
+
+        assert rate > 0, f'Argument "rate" should be a positive number'
+        assert capacity is None or capacity >= 1, f'Argument "capacity" should be at least 1'
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._timestamp = time.monotonic()
+
+    def _take(self, tokens: float, peek: bool = False) -> float:
+        # Refill, then take `tokens` if available (or only check that they are, with `peek`). Returns 0 if available, else the time to wait before trying again
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._timestamp) * self.rate)
+            self._timestamp = now
+            if self._tokens >= tokens:
+                if not peek:
+                    self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket if they are available, without waiting; meant for callers which wait on their own, say asyncio code
+
+        Args:
+            tokens: number of tokens to take
+
+        Returns:
+            0 if the tokens were taken, else the time (in seconds) to wait before trying again
+        """
+
+        return self._take(tokens)
+
+    def get_wait(self, tokens: float = 1) -> float:
+        """
+        Fetch the time until tokens are available in the bucket, without taking them
+
+        Args:
+            tokens: number of tokens
+
+        Returns:
+            0 if the tokens are available now, else the time (in seconds) to wait for them
+        """
+
+        return self._take(tokens, peek=True)
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """
+        Take tokens from the bucket, waiting for them if required
+
+        Args:
+            tokens: number of tokens to take
+            timeout: maximum time (in seconds) to wait; None means wait as long as required
+
+        Returns:
+            True if the tokens were taken, False if the timeout expired first
+        """
+
+        end_time = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait = self._take(tokens)
+            if wait == 0:
+                return True
+            if end_time is not None:
+                if time.monotonic() + wait > end_time:
+                    return False
+            time.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a file, so that all the processes on a host using the same file share one budget.
+
+    The file is locked with `flock` while the state is updated, hence this is available on POSIX systems only.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float = None):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            path: path of the file holding the bucket state; it is created if it does not exist
+            rate: sustained number of requests per second, across all the processes
+            capacity: maximum burst size, across all the processes; defaults to `rate`
+        """
+
+        if fcntl is None:
+            raise NotImplementedError('FileTokenBucket needs the fcntl module, which is not available on this platform. Use TokenBucket instead.')
+
+        super().__init__(rate=rate, capacity=capacity)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _take(self, tokens: float, peek: bool = False) -> float:
+        # Same as TokenBucket._take, with the state read from and written back to the file under an exclusive lock.
+        # Wall-clock time is used, since monotonic clocks are not comparable across processes.
+        with self._lock, open(self.path, 'a+') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    _tokens, _timestamp = (float(_) for _ in f.read().split())
+                except ValueError:
+                    _tokens, _timestamp = self.capacity, time.time()
+
+                now = time.time()
+                _tokens = min(self.capacity, _tokens + max(0.0, now - _timestamp) * self.rate)
+                wait = 0
+                if _tokens >= tokens:
+                    if not peek:
+                        _tokens -= tokens
+                else:
+                    wait = (tokens - _tokens) / self.rate
+
+                f.seek(0)
+                f.truncate()
+                f.write(f'{_tokens} {now}')
+                f.flush()
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+        return wait
+
+
+class RateLimiter:
+    """
+    Collection of token buckets, one per endpoint family. Families without a bucket are not limited.
+    """
+
+    def __init__(self):
+        """
+        Init method that is used while creating an object of this class
+        """
+
+        self.buckets = {}
+
+    def set_limit(self, family: str, rate: float, capacity: float = None, state_path: str = None):
+        """
+        Limit the requests made to an endpoint family
+
+        Args:
+            family: endpoint family; one of the values of `ENDPOINT_FAMILY_MAP` in the `api` module, or 'default' for all other endpoints
+            rate: sustained number of requests per second
+            capacity: maximum burst size; defaults to `rate`
+            state_path: if given, the budget is kept in this file and shared with every process using the same path
+        """
+
+        if state_path is None:
+            self.buckets[family] = TokenBucket(rate=rate, capacity=capacity)
+        else:
+            self.buckets[family] = FileTokenBucket(path=state_path, rate=rate, capacity=capacity)
+
+    def remove_limit(self, family: str):
+        """
+        Stop limiting the requests made to an endpoint family
+
+        Args:
+            family: endpoint family
+        """
+
+        self.buckets.pop(family, None)
+
+    def acquire(self, family: str):
+        """
+        Wait until a request to an endpoint family is allowed
+
+        Args:
+            family: endpoint family
+        """
+
+        bucket = self.buckets.get(family)
+        if bucket is not None:
+            bucket.acquire()
+
+    def get_wait(self, family: str) -> float:
+        """
+        Fetch the time until a request to an endpoint family is allowed, without taking its token; meant for callers which wait on their own (say, asyncio code)
+        before making the request, which then takes the token
+
+        Args:
+            family: endpoint family
+
+        Returns:
+            0 if a request is allowed now, else the time (in seconds) to wait
+        """
+
+        bucket = self.buckets.get(family)
+        return bucket.get_wait() if bucket is not None else 0
@@ -0,0 +1,160 @@
+"""
+Module for retrying calls to the [AlgoBulls](https://www.algobulls.com) backend.
+"""
+import random
+import time
+from datetime import datetime as dt, timezone
+from email.utils import parsedate_to_datetime
+
+from .exceptions import AlgoBullsAPIBaseException
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter, per-call deadlines and Retry-After support.
+
+    A call is retried when it raises an `AlgoBullsAPIBaseException` with a 5xx status code (this includes `AlgoBullsAPIGatewayTimeoutErrorException` and `AlgoBullsAPIInternalServerErrorException`),
+    or, optionally, when its result is not ready yet.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30, multiplier: float = 2, jitter: bool = True, deadline: float = None):
+        """
+        Init method that is used while creating an object of this class
+
+        Args:
+            max_attempts: maximum number of attempts, including the first one
+            base_delay: delay (in seconds) before the first retry
+            max_delay: upper limit (in seconds) on a single delay
+            multiplier: factor by which the delay grows after every attempt
+            jitter: if True, every delay is picked at random between 0 and its computed value ("full jitter"), which spreads out retries from concurrent callers
+            deadline: default time budget (in seconds) for a call, including all its retries; None means no limit
+        """
+
+        assert isinstance(max_attempts, int) and max_attempts > 0, f'Argument "max_attempts" should be a positive integer'
+        assert base_delay >= 0 and max_delay >= 0 and multiplier >= 1, f'Arguments "base_delay" and "max_delay" should be non-negative and "multiplier" should be at least 1'
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.hooks = []  # callables called as hook(attempt, exception, delay) before every retry, say for recording metrics
+
+    @staticmethod
+    def is_retryable(ex: Exception) -> bool:
+        """
+        Check if an exception raised by `AlgoBullsAPI._send_request` is worth retrying
+
+        Args:
+            ex: exception raised by the call
+
+        Returns:
+            True if the platform returned a 5xx status code, else False
+        """
+
+        return isinstance(ex, AlgoBullsAPIBaseException) and ex.status_code is not None and ex.status_code >= 500
+
+    @staticmethod
+    def get_retry_after(ex: Exception) -> float:
+        """
+        Fetch the delay requested by the platform through the Retry-After header
+
+        Args:
+            ex: exception raised by the call
+
+        Returns:
+            delay in seconds, or None if the header was absent or invalid
+        """
+
+        retry_after = getattr(ex, 'retry_after', None)
+        if not retry_after:
+            return None
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - dt.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def get_delay(self, attempt: int, ex: Exception = None) -> float:
+        """
+        Compute the delay before the next attempt
+
+        Args:
+            attempt: number of attempts made so far
+            ex: exception raised by the last attempt, if any
+
+        Returns:
+            delay in seconds
+        """
+
+        retry_after = self.get_retry_after(ex) if ex is not None else None
+        if retry_after is not None:
+            return retry_after
+
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def notify_retry(self, attempt: int, ex: Exception, delay: float):
+        """
+        Call the hooks of this policy for a retry; done by `call()`, and to be done by callers running their own retry loops with this policy (say, in asyncio code)
+
+        Args:
+            attempt: number of the attempt which failed, starting from 1
+            ex: exception raised by the attempt; None when retrying because the result was not ready
+            delay: time (in seconds) waited before the next attempt
+        """
+
+        for hook in self.hooks:
+            hook(attempt, ex, delay)
+
+    def call(self, func, *args, max_attempts: int = None, deadline: float = None, retry_if_result=None, on_retry=None, **kwargs):
+        """
+        Call `func(*args, **kwargs)`, retrying as per this policy
+
+        Args:
+            func: callable to be called
+            max_attempts: overrides `self.max_attempts` for this call
+            deadline: overrides `self.deadline` for this call
+            retry_if_result: optional callable which is given the result and returns True if the result is not ready yet and the call should be retried
+            on_retry: optional callable which is called as `on_retry(attempt, exception, delay)` before sleeping; `exception` is None when retrying because of `retry_if_result`
+
+        Returns:
+            result of the last attempt. If `retry_if_result` still returns True after all the attempts, that last result is returned.
+
+        Raises:
+            The last exception, if the call still fails with a retryable exception once the attempts or the deadline are exhausted, or straightaway for a non-retryable exception
+        """
+
+        max_attempts = max_attempts or self.max_attempts
+        deadline = deadline if deadline is not None else self.deadline
+        end_time = time.monotonic() + deadline if deadline is not None else None
+
+        attempt = 0
+        while True:
+            attempt += 1
+            ex = None
+            try:
+                result = func(*args, **kwargs)
+                if retry_if_result is None or not retry_if_result(result):
+                    return result
+            except Exception as _ex:
+                if not self.is_retryable(_ex):
+                    raise
+                ex = _ex
+
+            delay = self.get_delay(attempt, ex)
+            if attempt >= max_attempts or (end_time is not None and time.monotonic() + delay > end_time):
+                if ex is not None:
+                    raise ex
+                return result
+
+            self.notify_retry(attempt, ex, delay)
+            if on_retry is not None:
+                on_retry(attempt, ex, delay)
+            time.sleep(delay)
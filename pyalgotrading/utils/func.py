@@ -2,6 +2,7 @@
 A module for plotting candlesticks
 """
 from datetime import datetime as dt, timezone
+import itertools
 import random
 import pandas as pd
 
@@ -139,6 +140,28 @@ def get_raw_response(response_obj):
     return f'Content: {response_obj.content} | Raw: {response_obj.raw.data}'
 
 
+def get_columns_from_records(records, column_map):
+    """
+    Build columns straight from a list of nested dicts, without flattening every key of every record as `pd.json_normalize` does
+
+    Args:
+        records: list of dicts, as decoded from a JSON response
+        column_map: mapping of dotted key path (say 'entry.price') to column name
+
+    Returns:
+        dict of column name to list of values; missing keys give None
+    """
+
+    def _get(record, keys):
+        for key in keys:
+            if not isinstance(record, dict):
+                return None
+            record = record.get(key)
+        return record
+
+    return {column: [_get(record, keys) for record in records] for keys, column in ((path.split('.'), column) for path, column in column_map.items())}
+
+
 def get_datetime_with_tz(timestamp_str, trading_type, label=''):
     """
     Function converts the timestamp/time string to datetime object with timezone for BT, PT or RT for their respective formats
@@ -207,6 +230,50 @@ def calculate_brokerage(pnl_df, brokerage_percentage, brokerage_flat_price):
     return pnl_df
 
 
+def get_parameter_grid(parameters):
+    """
+    Expand strategy parameters into a list of grid points
+
+    Args:
+        parameters: dict of parameter name to list of values (every combination is a grid point), or a list of dicts (every dict is a grid point)
+
+    Returns:
+        list of dicts of parameter name to value
+    """
+
+    if isinstance(parameters, list):
+        return [dict(_) for _ in parameters]
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*(parameters[_] if isinstance(parameters[_], (list, tuple)) else [parameters[_]] for _ in names))]
+
+
+def get_pnl_metrics(pnl_df):
+    """
+    Compute summary metrics of a P&L table, for comparing jobs
+
+    Args:
+        pnl_df: P&L table, as returned by AlgoBullsConnection.get_report_pnl_table()
+
+    Returns:
+        dict with the number of trades, net P&L, win rate, average P&L per trade, maximum drawdown (absolute) and profit factor
+    """
+
+    if pnl_df is None or pnl_df.empty:
+        return {'trades': 0, 'net_pnl': 0.0, 'win_rate': None, 'avg_pnl': None, 'max_drawdown': 0.0, 'profit_factor': None}
+
+    net_pnl = pnl_df['net_pnl'].astype(float)
+    cumulative_pnl = net_pnl.cumsum()
+    gross_profit, gross_loss = net_pnl[net_pnl > 0].sum(), -net_pnl[net_pnl < 0].sum()
+    return {
+        'trades': len(net_pnl),
+        'net_pnl': cumulative_pnl.iloc[-1],
+        'win_rate': (net_pnl > 0).mean(),
+        'avg_pnl': net_pnl.mean(),
+        'max_drawdown': (cumulative_pnl.cummax().clip(lower=0) - cumulative_pnl).max(),  # the peak includes the initial P&L of 0
+        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else None,
+    }
+
+
 def slippage(price, variety, transaction_type, slip_percent=1):
 
     # convert slippage percentage to decimal
@@ -160,10 +160,9 @@ setup(
     #
     # Similar to `install_requires` above, these must be valid existing
     # projects.
-    # extras_require={  # Optional
-    #     'dev': ['check-manifest'],
-    #     'test': ['coverage'],
-    # },
+    extras_require={  # Optional
+        'orjson': ['orjson>=3.6'],  # faster decoding of the multi-MB report payloads
+    },
 
     # If there are data files included in your packages that need to be
     # installed, specify them here.